@@ -1,41 +1,25 @@
 import streamlit as st
-import requests
-import pandas as pd
 from datetime import datetime
-import re
 import uuid
+from functools import partial
+
+# Modules importés une seule fois par processus : les réexécutions du script ne redéfinissent
+# ni le moteur ni les éléments d'interface (pandas et requests ne sont chargés qu'à la première recherche)
+from engine import (
+    ACQUISITION_MODES, EVENT_TYPES, INSTITUTION_QUERY_BUDGET, PAGE_FETCH_DEADLINE, REGIONS, SERPER_CACHE_TTL_HOURS, SERPER_DAILY_CREDITS,
+    estimate_cost, get_page_cache, get_result_store, get_scheduler, saved_results, search_events, search_key
+)
+from exports import EXPORT_FORMATS, export_bytes
+from filters import EXCLUDE_KEYWORDS, compile_filter, parse_keywords
+from institutions import InstitutionRegistry, get_sheet_cache
+from tracing import NULL_TRACE, Trace
+from ui import ABOUT_MARKDOWN, StreamlitLog, freshness, show_trace
 
 # Version de l'application
 APP_VERSION = "2.2.0"
 
 st.set_page_config(page_title="Recherche Événements - Voix du Nucléaire", page_icon="🔬", layout="wide")
 
-def load_from_google_sheet(sheet_url):
-    """Charge les institutions depuis une Google Sheet publique"""
-    try:
-        # Extraire l'ID de la sheet depuis l'URL
-        if '/d/' in sheet_url:
-            sheet_id = sheet_url.split('/d/')[1].split('/')[0]
-        else:
-            return None, "❌ URL invalide. Utilisez le lien complet de votre Google Sheet."
-        
-        # Construire l'URL CSV
-        csv_url = f'https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv'
-        
-        # Charger les données
-        df = pd.read_csv(csv_url, header=None)
-        
-        # Extraire les URLs (première colonne)
-        institutions = []
-        for url in df[0].dropna():
-            url_str = str(url).strip()
-            if url_str.startswith('http'):
-                institutions.append(url_str)
-        
-        return institutions, None
-    except Exception as e:
-        return None, f"❌ Erreur lors du chargement: {str(e)}"
-
 # Initialize session state for institutions
 if 'institutions' not in st.session_state:
     st.session_state.institutions = []
@@ -43,10 +27,24 @@ if 'sheet_url' not in st.session_state:
     st.session_state.sheet_url = ''
 if 'temp_institutions' not in st.session_state:
     st.session_state.temp_institutions = []
+if 'sheet_load' not in st.session_state:
+    st.session_state.sheet_load = None
+
+def load_sheet(sheet_url, force=False):
+    """Charge une Google Sheet via le cache partagé et garde l'origine et la durée pour le mode debug"""
+    institutions, error, status = get_sheet_cache().load(sheet_url, force)
+    st.session_state.sheet_load = status
+    return institutions, error
+
+def session_registry():
+    """Institutions de la session indexées par domaine : celles de la Sheet (avec nom, région, type) puis les temporaires"""
+    sheet_load = st.session_state.sheet_load
+    registry = sheet_load['registre'] if sheet_load else InstitutionRegistry.from_urls(st.session_state.institutions)
+    return registry.extended(st.session_state.temp_institutions)
 
 # Charger automatiquement depuis Google Sheets au démarrage
 if st.session_state.sheet_url and not st.session_state.institutions:
-    institutions, error = load_from_google_sheet(st.session_state.sheet_url)
+    institutions, error = load_sheet(st.session_state.sheet_url)
     if not error and institutions:
         st.session_state.institutions = institutions
 
@@ -76,7 +74,7 @@ with st.sidebar:
         if st.button("💾 Sauvegarder", use_container_width=True):
             st.session_state.sheet_url = sheet_url_input
             if sheet_url_input:
-                institutions, error = load_from_google_sheet(sheet_url_input)
+                institutions, error = load_sheet(sheet_url_input)
                 if error:
                     st.error(error)
                 else:
@@ -86,7 +84,8 @@ with st.sidebar:
     
     with col2:
         if st.button("🔄 Recharger", use_container_width=True, disabled=not st.session_state.sheet_url):
-            institutions, error = load_from_google_sheet(st.session_state.sheet_url)
+            # Recharger ignore le cache partagé : la Sheet est téléchargée à nouveau
+            institutions, error = load_sheet(st.session_state.sheet_url, force=True)
             if error:
                 st.error(error)
             else:
@@ -98,14 +97,64 @@ with st.sidebar:
     if st.session_state.institutions:
         st.caption(f"✅ {len(st.session_state.institutions)} institution(s) chargée(s) depuis Sheets")
     
+    sheet_load = st.session_state.sheet_load
+    if sheet_load and sheet_load['nb_rejets']:
+        with st.expander(f"⚠️ {sheet_load['nb_rejets']} ligne(s) de la Sheet ignorée(s)"):
+            for line, value, reason in sheet_load['rejets']:
+                st.caption(f"Ligne {line} : `{value}` ({reason})")
+    
     st.markdown("---")
     
-    fetch_dates = st.checkbox("Chercher les dates sur les pages web", value=False, help="Plus précis mais plus lent (1-2 sec par résultat)")
+    fetch_dates = st.checkbox("Chercher les dates sur les pages web", value=False, help=f"Plus précis mais plus lent (jusqu'à {PAGE_FETCH_DEADLINE} sec de plus par recherche)")
     debug_mode = st.checkbox("Mode debug", help="Affiche les résultats bruts avant filtrage")
+    if debug_mode and st.session_state.sheet_load:
+        st.caption(f"📊 Dernier chargement de la Sheet : {st.session_state.sheet_load['origine']} "
+                   f"en {st.session_state.sheet_load['durée'] * 1000:.0f} ms")
+    
+    cache_ttl_hours = st.number_input(
+        "Durée du cache (heures)",
+        min_value=0,
+        max_value=24 * 7,
+        value=SERPER_CACHE_TTL_HOURS,
+        help="Les requêtes identiques faites pendant cette durée réutilisent la réponse enregistrée (0 = pas de cache)"
+    )
+    institution_budget = st.number_input(
+        "Requêtes max. sur les institutions",
+        min_value=1,
+        max_value=20,
+        value=INSTITUTION_QUERY_BUDGET,
+        help="Chaque requête couvre une quinzaine d'institutions ; si votre liste est plus longue, les recherches suivantes couvrent les institutions restantes"
+    )
+    daily_credits = st.number_input(
+        "Crédits Serper par jour",
+        min_value=1,
+        value=SERPER_DAILY_CREDITS,
+        help="Quand il reste peu de crédits, seules les requêtes les plus utiles sont envoyées"
+    )
+    st.caption(f"💳 {get_scheduler().used_today()}/{daily_credits} crédit(s) utilisé(s) aujourd'hui")
+    force_refresh = st.checkbox("Forcer l'actualisation", help="Ignore le cache, interroge Serper à nouveau et revalide les pages web")
+    
+    if st.button("🗑️ Vider le cache des pages", use_container_width=True):
+        get_page_cache().clear()
+        st.success("✅ Cache des pages vidé")
+    
+    with st.expander("🚫 Filtres par mots-clés"):
+        exclude_text = st.text_area(
+            "Exclure les résultats contenant",
+            value=", ".join(EXCLUDE_KEYWORDS),
+            help="Mots-clés séparés par des virgules, sans tenir compte des majuscules ni des accents"
+        )
+        include_text = st.text_area(
+            "Ne garder que les résultats contenant",
+            placeholder="Ex: forum, salon, journée",
+            help="Laisser vide pour tout garder ; sinon un résultat doit contenir au moins l'un de ces mots-clés"
+        )
+    # Compilé une seule fois par combinaison de listes (les réexécutions réutilisent le même filtre)
+    keyword_filter = compile_filter(parse_keywords(exclude_text), parse_keywords(include_text))
     
     st.markdown("---")
     st.markdown("**Comment configurer Google Sheets?**")
-    st.markdown("1. Créez une Sheet avec vos institutions (URL en colonne A)")
+    st.markdown("1. Créez une Sheet avec vos institutions (URL en colonne A ; nom, région et type facultatifs en colonnes B, C et D)")
     st.markdown("2. Partager → Tous les utilisateurs → Lecteur")
     st.markdown("3. Copiez le lien ci-dessus")
     
@@ -115,298 +164,15 @@ with st.sidebar:
     st.markdown("2. Créez un compte")
     st.markdown("3. Copiez votre clé API")
 
-def extract_date(text):
-    """Extrait une date du texte - version améliorée"""
-    if not text:
-        return None
-    
-    text = text.lower()
-    
-    months_fr = {
-        'janvier': '01', 'février': '02', 'fevrier': '02', 'mars': '03', 'avril': '04',
-        'mai': '05', 'juin': '06', 'juillet': '07', 'août': '08', 'aout': '08',
-        'septembre': '09', 'octobre': '10', 'novembre': '11', 'décembre': '12', 'decembre': '12',
-        'jan': '01', 'fév': '02', 'fev': '02', 'mar': '03', 'avr': '04',
-        'sept': '09', 'oct': '10', 'nov': '11', 'déc': '12', 'dec': '12'
-    }
-    
-    # Pattern 1: "15 janvier 2025" ou "15 janvier" ou "janvier 2025"
-    pattern1 = r'(\d{1,2})\s+(' + '|'.join(months_fr.keys()) + r')(?:\s+(\d{4}))?'
-    match = re.search(pattern1, text)
-    if match:
-        day = match.group(1) if match.group(1) else ''
-        month = months_fr[match.group(2)]
-        year = match.group(3) if match.group(3) else str(datetime.now().year)
-        if day:
-            return f"{day}/{month}/{year}"
-        else:
-            return f"{month}/{year}"
-    
-    # Pattern 2: "du 15 au 17 janvier 2025"
-    pattern2 = r'du\s+(\d{1,2})\s+au\s+(\d{1,2})\s+(' + '|'.join(months_fr.keys()) + r')\s+(\d{4})'
-    match = re.search(pattern2, text)
-    if match:
-        day1 = match.group(1)
-        day2 = match.group(2)
-        month = months_fr[match.group(3)]
-        year = match.group(4)
-        return f"{day1}-{day2}/{month}/{year}"
-    
-    # Pattern 3: "15/01/2025" ou "15-01-2025" ou "15.01.2025"
-    pattern3 = r'(\d{1,2})[\/\-\.](\d{1,2})[\/\-\.](\d{2,4})'
-    match = re.search(pattern3, text)
-    if match:
-        return f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
-    
-    # Pattern 4: "2025-01-15" (format ISO)
-    pattern4 = r'(\d{4})[\/\-](\d{1,2})[\/\-](\d{1,2})'
-    match = re.search(pattern4, text)
-    if match:
-        return f"{match.group(3)}/{match.group(2)}/{match.group(1)}"
-    
-    # Pattern 5: "samedi 15 janvier" ou "lundi 3 mars 2025"
-    days = r'(?:lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)'
-    pattern5 = days + r'\s+(\d{1,2})\s+(' + '|'.join(months_fr.keys()) + r')(?:\s+(\d{4}))?'
-    match = re.search(pattern5, text)
-    if match:
-        day = match.group(1)
-        month = months_fr[match.group(2)]
-        year = match.group(3) if match.group(3) else str(datetime.now().year)
-        return f"{day}/{month}/{year}"
-    
-    return None
-
-def parse_date(date_str):
-    """Convertit une date string en objet datetime pour comparaison"""
-    if not date_str or date_str == 'Date à confirmer':
-        return None
-    
-    try:
-        # Essayer différents formats
-        formats = [
-            '%d/%m/%Y',      # 15/01/2025
-            '%d/%m/%y',      # 15/01/25
-            '%m/%Y',         # 01/2025
-        ]
-        
-        # Nettoyer la date (enlever les plages "15-17/01/2025" -> prendre la première date)
-        if '-' in date_str and '/' in date_str:
-            # Format "15-17/01/2025" -> "15/01/2025"
-            parts = date_str.split('-')
-            if len(parts) > 1:
-                date_str = parts[0] + date_str[date_str.index('/'):]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except:
-                continue
-        
-        return None
-    except:
-        return None
-
-def is_future_event(date_str, min_date=None):
-    """Vérifie si un événement est futur par rapport à une date minimum"""
-    if date_str == 'Date à confirmer':
-        return True  # Garder les événements sans date confirmée
-    
-    parsed_date = parse_date(date_str)
-    if not parsed_date:
-        return True  # En cas de doute, garder
-    
-    # Utiliser la date minimum fournie, ou aujourd'hui par défaut
-    if min_date is None:
-        min_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    else:
-        min_date = min_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    return parsed_date >= min_date
-
-def extract_date_from_url(url):
-    """Tente d'extraire une date en allant chercher sur la page web"""
-    try:
-        response = requests.get(url, timeout=3)
-        if response.status_code == 200:
-            # Chercher des dates dans le HTML (sans parser tout le HTML pour rester rapide)
-            html = response.text[:5000]  # Premiers 5000 caractères seulement
-            date = extract_date(html)
-            return date
-    except:
-        pass
-    return None
-
-def search_events(query, region, api_key, num_results=20, fetch_dates_from_web=False, institutions=None, search_scope="web", min_date=None, debug=False):
-    """Recherche les événements via Serper API avec requêtes multiples"""
-    if not api_key:
-        st.error("⚠️ Veuillez entrer votre clé API Serper dans la barre latérale")
-        return None, None
-    
-    region_part = region if region != "Toute la France" else ""
-    year = datetime.now().year
-    
-    # Définir les variations de requête selon le nombre demandé et le scope
-    variations = []
-    
-    # Si recherche ciblée sur institutions
-    if search_scope == "institutions" and institutions:
-        if debug:
-            st.info(f"🏫 Recherche ciblée sur {len(institutions)} institution(s)")
-        
-        # Créer une requête par institution (limité aux 5 premières pour ne pas dépasser les quotas)
-        for inst in institutions[:5]:
-            # Extraire le domaine de l'URL
-            domain = inst.replace('https://', '').replace('http://', '').split('/')[0]
-            base_query = f'{query} site:{domain} {year}'
-            variations.append(base_query)
-    
-    # Recherche web standard (avec priorité institutions si disponibles)
-    else:
-        if num_results <= 10:
-            # Une seule recherche
-            base = f'{query} {region_part if region_part else "France"} {year}'
-            
-            # Ajouter les institutions en priorité
-            if institutions and len(institutions) > 0:
-                domains = ' OR '.join([f'site:{inst.replace("https://", "").replace("http://", "").split("/")[0]}' for inst in institutions[:3]])
-                variations = [f'{query} ({domains}) {year}', base]
-            else:
-                variations = [base]
-        
-        elif num_results <= 30:
-            base = f'{query} {region_part if region_part else "France"} {year}'
-            variations = [
-                base,
-                f'{query} université {region_part if region_part else "France"} {year}',
-                f'{query} "école ingénieurs" {region_part if region_part else "France"} {year}'
-            ]
-        else:
-            base = f'{query} {region_part if region_part else "France"} {year}'
-            variations = [
-                base,
-                f'{query} université {region_part if region_part else "France"} {year}',
-                f'{query} "école ingénieurs" {region_part if region_part else "France"} {year}',
-                f'{query} IUT {region_part if region_part else "France"} {year}',
-                f'{query} étudiant {region_part if region_part else "France"} {year}'
-            ]
-    
-    if debug:
-        st.info(f"🔍 {len(variations)} requête(s) pour obtenir ~{num_results} résultats")
-    
-    all_raw_results = []
-    seen_urls = set()
-    
-    try:
-        for i, full_query in enumerate(variations):
-            if debug:
-                st.info(f"📡 Requête {i+1}/{len(variations)}: `{full_query}`")
-            
-            response = requests.post(
-                'https://google.serper.dev/search',
-                headers={
-                    'X-API-KEY': api_key,
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'q': full_query,
-                    'gl': 'fr',
-                    'hl': 'fr'
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 401:
-                st.error("❌ Clé API invalide. Vérifiez votre clé Serper.")
-                return None, None
-            elif response.status_code != 200:
-                st.error(f"❌ Erreur API: {response.status_code}")
-                continue
-            
-            data = response.json()
-            
-            if 'organic' in data:
-                for item in data['organic']:
-                    url = item.get('link', '')
-                    # Éviter les doublons
-                    if url and url not in seen_urls:
-                        seen_urls.add(url)
-                        all_raw_results.append(item)
-        
-        if debug:
-            st.info(f"📊 Total: {len(all_raw_results)} résultats uniques obtenus")
-        
-        if len(all_raw_results) == 0:
-            return [], []
-        
-        # Résultats bruts
-        raw_results = []
-        for item in all_raw_results:
-            date = extract_date(item.get('snippet', '') + ' ' + item.get('title', ''))
-            
-            # Si pas de date trouvée et option activée, chercher sur la page
-            if not date and fetch_dates_from_web:
-                url = item.get('link', '')
-                if url:
-                    date = extract_date_from_url(url)
-            
-            raw_results.append({
-                'Date': date or 'Date à confirmer',
-                'Événement': item.get('title', ''),
-                'Description': item.get('snippet', ''),
-                'Lien': item.get('link', '')
-            })
-        
-        # Mots-clés à filtrer côté client
-        exclude_keywords = ['tourisme', 'hôtellerie', 'restauration', 'cuisine', 'gastronomie', 
-                           'hôtelier', 'culinaire', 'arts culinaires', 'service en salle']
-        
-        filtered_results = []
-        past_events_count = 0
-        
-        for item in all_raw_results:
-            title_lower = item.get('title', '').lower()
-            snippet_lower = item.get('snippet', '').lower()
-            
-            # Filtrer les résultats non pertinents
-            if any(keyword in title_lower or keyword in snippet_lower for keyword in exclude_keywords):
-                continue
-            
-            date = extract_date(item.get('snippet', '') + ' ' + item.get('title', ''))
-            
-            # Si pas de date trouvée et option activée, chercher sur la page
-            if not date and fetch_dates_from_web:
-                url = item.get('link', '')
-                if url:
-                    date = extract_date_from_url(url)
-            
-            date_final = date or 'Date à confirmer'
-            
-            # Filtrer les événements passés (par rapport à min_date)
-            if not is_future_event(date_final, min_date):
-                past_events_count += 1
-                continue
-            
-            filtered_results.append({
-                'Date': date_final,
-                'Événement': item.get('title', ''),
-                'Description': item.get('snippet', ''),
-                'Lien': item.get('link', '')
-            })
-        
-        if debug and past_events_count > 0:
-            st.info(f"🗓️ {past_events_count} événement(s) passé(s) exclu(s)")
-        
-        return filtered_results, raw_results if debug else None
-    
-    except Exception as e:
-        st.error(f"❌ Erreur: {str(e)}")
-        return None, None
-
 # Tabs
 tab1, tab2, tab3 = st.tabs(["🔍 Recherche", "🏫 Institutions", "ℹ️ À propos"])
 
+# Les onglets Institutions et Recherche sont des fragments : une interaction à l'intérieur d'un onglet
+# ne réexécute que cet onglet (barre latérale, autres onglets et "À propos" ne sont pas recalculés)
+
 # ===== TAB 2: INSTITUTIONS =====
-with tab2:
+@st.fragment
+def institutions_tab():
     st.header("Gestion des institutions")
     
     if st.session_state.sheet_url:
@@ -418,8 +184,16 @@ with tab2:
     # Display institutions from Google Sheets
     if st.session_state.institutions:
         st.markdown(f"### 📋 Institutions (depuis Google Sheets)")
-        for i, inst in enumerate(st.session_state.institutions):
-            st.text(f"• {inst}")
+        # Un seul élément pour toute la liste, quelle que soit sa longueur
+        sheet_load = st.session_state.sheet_load
+        if sheet_load:
+            # Avec le nom lu dans la Sheet quand il y en a un
+            st.text("\n".join(
+                f"• {institution.name} ({institution.url})" if institution.name else f"• {institution.url}"
+                for institution in sheet_load['registre'].institutions
+            ))
+        else:
+            st.text("\n".join(f"• {inst}" for inst in st.session_state.institutions))
     
     st.markdown("---")
     
@@ -464,8 +238,12 @@ with tab2:
                     st.session_state.temp_institutions.pop(i)
                     st.rerun()
 
+with tab2:
+    institutions_tab()
+
 # ===== TAB 1: RECHERCHE =====
-with tab1:
+@st.fragment
+def search_tab():
     # Combiner les institutions Google Sheets + temporaires
     all_institutions = st.session_state.institutions + st.session_state.temp_institutions
     
@@ -493,7 +271,7 @@ with tab1:
         if search_mode == "Recherche rapide":
             event_type = st.selectbox(
                 "Type d'événement",
-                ["forum des métiers", "journée orientation", "portes ouvertes", "journée découverte"]
+                EVENT_TYPES
             )
             search_query = event_type
         else:
@@ -503,25 +281,17 @@ with tab1:
             )
 
     with col2:
-        regions = [
-            "Toute la France",
-            "Auvergne-Rhône-Alpes",
-            "Bourgogne-Franche-Comté",
-            "Bretagne",
-            "Centre-Val de Loire",
-            "Corse",
-            "Grand Est",
-            "Hauts-de-France",
-            "Île-de-France",
-            "Normandie",
-            "Nouvelle-Aquitaine",
-            "Occitanie",
-            "Pays de la Loire",
-            "Provence-Alpes-Côte d'Azur"
-        ]
-        region = st.selectbox("Région", regions)
+        region = st.selectbox("Région", REGIONS)
         
         num_results = st.selectbox("Nombre de résultats", [10, 20, 50], index=1)
+        acquisition = st.radio(
+            "Au-delà de 10 résultats",
+            ACQUISITION_MODES,
+            format_func={"variations": "Variations de la requête", "pages": "Pages suivantes"}.get,
+            horizontal=True,
+            disabled=num_results <= 10,
+            help="Pages suivantes : la requête de base est paginée et la pagination s'arrête dès qu'une page n'apporte presque plus de nouveaux liens (moins de crédits pour autant de résultats uniques)"
+        )
         
         min_date = st.date_input(
             "À partir du",
@@ -529,6 +299,31 @@ with tab1:
             help="Ne montrer que les événements à partir de cette date"
         )
 
+    # Coût projeté de la recherche, avant de la lancer
+    if search_query:
+        num_queries, credits = estimate_cost(
+            search_query,
+            region,
+            num_results,
+            all_institutions,
+            "institutions" if search_scope == "🏫 Uniquement dans mes institutions" else "web",
+            cache_ttl=cache_ttl_hours * 3600,
+            force_refresh=force_refresh,
+            institution_budget=institution_budget,
+            acquisition=acquisition
+        )
+        remaining_credits = get_scheduler().remaining(daily_credits)
+        # En mode "pages", la pagination peut s'arrêter avant la dernière page
+        at_most = "au plus " if acquisition == "pages" and num_results > 10 else ""
+        st.caption(f"💳 Coût estimé : {at_most}{credits} crédit(s) Serper pour {num_queries} requête(s) "
+                   f"({num_queries - credits} en cache) · {remaining_credits} crédit(s) restant(s) aujourd'hui")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        incremental = st.checkbox("Signaler les nouveaux résultats", value=True, help="Compare aux résultats déjà enregistrés : les résultats connus reprennent leur date sans nouvelle analyse")
+    with col2:
+        only_new = st.checkbox("Uniquement les nouveaux", disabled=not incremental, help="N'affiche que les résultats jamais vus lors des recherches précédentes")
+    
     search_button = st.button("🔍 Rechercher", type="primary", use_container_width=True)
 
     if fetch_dates:
@@ -544,98 +339,113 @@ with tab1:
         
         if not search_query:
             st.warning("⚠️ Veuillez entrer un type d'événement")
+        elif not api_key:
+            st.error("⚠️ Veuillez entrer votre clé API Serper dans la barre latérale")
         else:
             # Déterminer le scope de recherche
-            scope = "institutions" if "institutions" in search_scope else "web"
-            
-            # Combiner institutions Google Sheets + temporaires
-            all_institutions = st.session_state.institutions + st.session_state.temp_institutions
+            # (le libellé "Sur le web" mentionne aussi les institutions : comparer le libellé entier)
+            scope = "institutions" if search_scope == "🏫 Uniquement dans mes institutions" else "web"
             
             # Convertir la date en datetime
             min_datetime = datetime.combine(min_date, datetime.min.time())
             
-            with st.spinner("🔍 Recherche en cours..."):
-                results, raw_results = search_events(
-                    search_query, 
-                    region, 
-                    api_key, 
-                    num_results, 
-                    fetch_dates, 
-                    all_institutions,
-                    scope,
-                    min_datetime,
-                    debug_mode
-                )
+            # Durée de chaque étape et compteurs, affichés et enregistrés en mode debug
+            trace = Trace(search_id) if debug_mode else NULL_TRACE
             
-            if results is None:
-                pass  # L'erreur a déjà été affichée
-            elif len(results) == 0:
-                if debug_mode and raw_results:
-                    st.warning(f"⚠️ {len(raw_results)} résultat(s) trouvé(s) mais tous filtrés (tourisme, hôtellerie, etc.)")
-                    st.markdown("### 🔍 Résultats bruts (avant filtrage)")
-                    df_raw = pd.DataFrame(raw_results)
-                    st.dataframe(
-                        df_raw,
-                        column_config={
-                            "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
-                        },
-                        hide_index=True,
-                        use_container_width=True
-                    )
-                else:
-                    st.info("ℹ️ Aucun résultat trouvé. Essayez avec d'autres termes ou une autre région.")
+            # Même recherche déjà calculée (par prewarm.py ou une recherche précédente) : réponse immédiate
+            # (le mode debug et "Forcer l'actualisation" relancent toujours la recherche)
+            # Même registre pour la clé et la recherche (domaines dans le même ordre)
+            registry = session_registry()
+            key = search_key(search_query, region, num_results, fetch_dates, registry, scope, keyword_filter, acquisition, institution_budget)
+            # Durée du cache à 0 : pas de résultats enregistrés non plus, la recherche est toujours relancée
+            use_saved = not (debug_mode or force_refresh or cache_ttl_hours == 0)
+            results, saved_at = saved_results(key, min_datetime, incremental) if use_saved else (None, None)
+            if results is not None:
+                raw_results = None
+                st.info(f"⚡ Résultats calculés {freshness(saved_at)}, sans nouvel appel à Serper "
+                        f"(cochez « Forcer l'actualisation » pour relancer la recherche)")
             else:
-                if debug_mode and raw_results:
-                    filtered_count = len(raw_results) - len(results)
-                    st.success(f"✅ {len(results)} événement(s) pertinent(s) ({filtered_count} filtré(s))")
-                else:
-                    st.success(f"✅ {len(results)} événement(s) trouvé(s)")
-                
-                # Créer un DataFrame
-                df = pd.DataFrame(results)
-                
-                # Boutons d'export
-                col1, col2 = st.columns(2)
-                with col1:
-                    csv = df.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label="📥 Télécharger CSV",
-                        data=csv,
-                        file_name=f"evenements-vdn-{datetime.now().strftime('%Y-%m-%d')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                # Les résultats provisoires s'affichent pendant la recherche, puis laissent la place au tableau final
+                log = StreamlitLog()
+                with st.spinner("🔍 Recherche en cours..."):
+                    results, raw_results = search_events(
+                        search_query, 
+                        region, 
+                        api_key, 
+                        num_results, 
+                        fetch_dates, 
+                        registry,
+                        scope,
+                        min_datetime,
+                        debug_mode,
+                        cache_ttl=cache_ttl_hours * 3600,
+                        force_refresh=force_refresh,
+                        log=log,
+                        institution_budget=institution_budget,
+                        daily_credits=daily_credits,
+                        incremental=incremental,
+                        keyword_filter=keyword_filter,
+                        acquisition=acquisition,
+                        trace=trace
                     )
+                log.clear_partial()
+            
+            # Rendu du tableau et des exports (mesuré avec le reste de la recherche en mode debug)
+            with trace.span('affichage'):
+                if results is not None and incremental:
+                    new_count = len(results.where('Nouveau'))
+                    st.info(f"🆕 {new_count} nouvel(s) événement(s) depuis la dernière recherche")
+                    if only_new:
+                        results = results.where('Nouveau')
+            
+                if results is None:
+                    pass  # L'erreur a déjà été affichée
+                elif len(results) == 0:
+                    if debug_mode and raw_results:
+                        st.warning(f"⚠️ {len(raw_results)} résultat(s) trouvé(s) mais tous filtrés (tourisme, hôtellerie, etc.)")
+                        st.markdown("### 🔍 Résultats bruts (avant filtrage)")
+                        df_raw = raw_results.to_frame()
+                        st.dataframe(
+                            df_raw,
+                            column_config={
+                                "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
+                            },
+                            hide_index=True,
+                            use_container_width=True
+                        )
+                    else:
+                        st.info("ℹ️ Aucun résultat trouvé. Essayez avec d'autres termes ou une autre région.")
+                else:
+                    if debug_mode and raw_results:
+                        filtered_count = len(raw_results) - len(results)
+                        st.success(f"✅ {len(results)} événement(s) pertinent(s) ({filtered_count} filtré(s))")
+                    else:
+                        st.success(f"✅ {len(results)} événement(s) trouvé(s)")
                 
-                with col2:
-                    # Copie pour Excel (format TSV)
-                    tsv = df.to_csv(index=False, sep='\t')
-                    st.download_button(
-                        label="📋 Télécharger pour Excel",
-                        data=tsv,
-                        file_name=f"evenements-vdn-{datetime.now().strftime('%Y-%m-%d')}.txt",
-                        mime="text/plain",
-                        use_container_width=True
-                    )
+                    # DataFrame construit colonne par colonne à partir de la table de résultats
+                    df = results.to_frame()
                 
-                # Affichage du tableau
-                st.markdown("### Résultats filtrés")
+                    # Boutons d'export : chaque fichier n'est écrit qu'au clic, une seule fois par recherche
+                    # (on_click="ignore" : le téléchargement ne relance pas la page et garde les résultats affichés)
+                    export_date = datetime.now().strftime('%Y-%m-%d')
+                    for column, (fmt, (extension, mime, label)) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+                        with column:
+                            st.download_button(
+                                label=label,
+                                data=partial(export_bytes, results, search_id, fmt),
+                                file_name=f"evenements-vdn-{export_date}.{extension}",
+                                mime=mime,
+                                on_click="ignore",
+                                use_container_width=True
+                            )
+                    st.caption("📅 Le calendrier ne contient que les événements dont le jour est connu.")
                 
-                # Configuration des colonnes pour l'affichage
-                st.dataframe(
-                    df,
-                    column_config={
-                        "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
+                    # Affichage du tableau
+                    st.markdown("### Résultats filtrés")
                 
-                # Afficher les résultats bruts en mode debug
-                if debug_mode and raw_results and len(raw_results) > len(results):
-                    st.markdown("### 🔍 Tous les résultats (avant filtrage)")
-                    df_raw = pd.DataFrame(raw_results)
+                    # Configuration des colonnes pour l'affichage
                     st.dataframe(
-                        df_raw,
+                        df,
                         column_config={
                             "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
                         },
@@ -643,178 +453,58 @@ with tab1:
                         use_container_width=True
                     )
                 
-                st.info("💡 **Astuce:** Vérifiez chaque lien pour confirmer que l'événement est gratuit pour les intervenants")
+                    # Afficher les résultats bruts en mode debug
+                    if debug_mode and raw_results and len(raw_results) > len(results):
+                        st.markdown("### 🔍 Tous les résultats (avant filtrage)")
+                        df_raw = raw_results.to_frame()
+                        st.dataframe(
+                            df_raw,
+                            column_config={
+                                "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
+                            },
+                            hide_index=True,
+                            use_container_width=True
+                        )
+                
+                    st.info("💡 **Astuce:** Vérifiez chaque lien pour confirmer que l'événement est gratuit pour les intervenants")
+            
+            if trace.enabled:
+                show_trace(trace, trace.write())
+    
+    # Événements des recherches précédentes, lus dans la base locale (sans appel à Serper)
+    # seulement quand ils sont affichés
+    if st.toggle("📚 Afficher les événements déjà enregistrés"):
+        stored = get_result_store().events_after(
+            datetime.combine(min_date, datetime.min.time()),
+            None if region == "Toute la France" else region
+        )
+        if stored:
+            st.caption(f"{len(stored)} événement(s) daté(s) à partir du {min_date.strftime('%d/%m/%Y')}")
+            st.dataframe(
+                [{
+                    'Date': event['date'],
+                    'Événement': event['title'],
+                    'Description': event['snippet'],
+                    'Lien': event['link'],
+                    'Vu le': datetime.fromtimestamp(event['first_seen']).strftime('%d/%m/%Y')
+                } for event in stored],
+                column_config={
+                    "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("Aucun événement daté enregistré pour ces critères.")
+
+with tab1:
+    search_tab()
 
 # ===== TAB 3: À PROPOS =====
 with tab3:
     st.header("ℹ️ À propos de cet outil")
     
-    st.markdown("""
-    ## 🎯 Qu'est-ce que cet outil ?
-    
-    Cet outil aide **Voix du Nucléaire** à trouver automatiquement des événements universitaires 
-    (forums des métiers, portes ouvertes, journées orientation) où présenter l'association et 
-    discuter de l'énergie nucléaire.
-    
-    Au lieu de chercher manuellement sur Google, l'outil fait le travail pour vous et affiche 
-    les résultats dans un tableau facile à exporter.
-    
-    ---
-    
-    ## 🔑 Pourquoi une clé API Serper ?
-    
-    **Serper** est un service qui permet de faire des recherches Google de manière automatisée.
-    
-    **Pourquoi c'est nécessaire :**
-    - Google ne permet pas de faire des recherches automatiques gratuitement
-    - Serper sert d'intermédiaire pour accéder aux résultats Google
-    - Chaque utilisateur doit avoir sa propre clé (gratuite)
-    
-    **Ce que ça coûte :**
-    - ✅ **100 recherches gratuites par jour** (largement suffisant !)
-    - Après 100 recherches : environ 5€ pour 1000 recherches supplémentaires
-    - Pour un usage normal : vous resterez dans le quota gratuit
-    
-    **Comment obtenir votre clé :**
-    1. Allez sur [serper.dev](https://serper.dev)
-    2. Créez un compte (avec Google ou email)
-    3. Copiez votre clé API (affichée sur le dashboard)
-    4. Collez-la dans la barre latérale de cet outil
-    
-    **Sécurité :**
-    - Votre clé n'est jamais sauvegardée sur nos serveurs
-    - Elle reste dans votre navigateur uniquement
-    - Ne partagez jamais votre clé avec d'autres personnes
-    
-    ---
-    
-    ## 📊 Pourquoi Google Sheets ?
-    
-    **Google Sheets** permet à chaque utilisateur d'avoir sa propre liste d'institutions à surveiller.
-    
-    **Avantages :**
-    - ✅ Facile à modifier (interface familière)
-    - ✅ Accessible de partout (ordinateur, téléphone)
-    - ✅ Partage possible avec des collègues
-    - ✅ Historique des modifications
-    
-    **Comment configurer :**
-    1. Créez une nouvelle Google Sheet
-    2. Mettez vos URLs d'institutions en colonne A (une par ligne)
-       ```
-       https://www.ec-lyon.fr/
-       https://www.insa-lyon.fr/
-       https://www.cpe.fr/
-       ```
-    3. Partager → "Tous les utilisateurs disposant du lien" → **Lecteur**
-    4. Copiez le lien de la Sheet
-    5. Collez-le dans la barre latérale de l'outil
-    6. Cliquez "💾 Sauvegarder"
-    
-    **Pour modifier votre liste :**
-    - Éditez directement votre Google Sheet
-    - Revenez dans l'outil et cliquez "🔄 Recharger"
-    
-    ---
-    
-    ## 🚀 Comment utiliser l'outil ?
-    
-    ### Workflow typique :
-    
-    1. **Configuration initiale** (une seule fois)
-       - Obtenez votre clé Serper
-       - Créez votre Google Sheet avec vos institutions
-       - Configurez les deux dans la barre latérale
-    
-    2. **Recherche d'événements**
-       - Allez dans l'onglet "🔍 Recherche"
-       - Choisissez le type d'événement (forum, portes ouvertes, etc.)
-       - Choisissez la région (ou "Toute la France")
-       - Décidez si vous cherchez uniquement dans vos institutions ou sur tout le web
-       - Cliquez "🔍 Rechercher"
-    
-    3. **Exploitation des résultats**
-       - Consultez le tableau
-       - Cliquez sur les liens pour vérifier les événements
-       - Téléchargez en CSV ou pour Excel
-       - Partagez avec votre équipe
-    
-    ---
-    
-    ## 🎛️ Options de recherche
-    
-    **Deux modes de recherche :**
-    - **🏫 Uniquement dans mes institutions** : Cherche SEULEMENT sur les sites de votre liste
-    - **🌐 Sur le web (+ priorité aux institutions)** : Cherche partout, mais privilégie vos institutions
-    
-    **Nombre de résultats :**
-    - **10** : Rapide, pour un coup d'œil
-    - **20** : Équilibré (recommandé)
-    - **50** : Recherche exhaustive (plus lent)
-    
-    **À partir du :**
-    - Sélectionnez une date pour ne voir que les événements à partir de cette date
-    - Par défaut : aujourd'hui (ne montre que les événements futurs)
-    - Utile pour planifier à l'avance (ex: "événements à partir de mars 2026")
-    
-    **Options avancées (barre latérale) :**
-    - **Chercher les dates sur les pages web** : Plus précis mais plus lent (1-2 sec par résultat)
-    - **Mode debug** : Affiche des informations techniques sur la recherche
-    
-    ---
-    
-    ## 📋 Filtres automatiques
-    
-    L'outil filtre automatiquement :
-    - ❌ **Événements passés** (garde uniquement les événements futurs)
-    - ❌ **Tourisme, hôtellerie, restauration** (non pertinents pour VDN)
-    - ❌ **Événements sans rapport** avec les écoles/universités
-    
-    ---
-    
-    ## ❓ Questions fréquentes
-    
-    **Q : Pourquoi certaines dates sont "Date à confirmer" ?**  
-    R : La date n'apparaît pas dans le titre ou la description Google. Cliquez sur le lien pour la trouver sur le site.
-    
-    **Q : Puis-je partager ma clé Serper avec des collègues ?**  
-    R : Non, chaque personne doit avoir sa propre clé. C'est gratuit et rapide à créer.
-    
-    **Q : Puis-je partager ma Google Sheet avec des collègues ?**  
-    R : Oui ! Vous pouvez collaborer sur la même Sheet. Chacun devra juste mettre le même lien dans son outil.
-    
-    **Q : L'outil sauvegarde-t-il mes recherches ?**  
-    R : Non, les recherches ne sont pas sauvegardées. Téléchargez les résultats en CSV si vous voulez les garder.
-    
-    **Q : Combien de recherches puis-je faire ?**  
-    R : 100 recherches gratuites par jour avec Serper. Une "recherche" peut générer 10-50 résultats.
-    
-    **Q : Les données sont-elles sécurisées ?**  
-    R : Oui. Votre clé API reste dans votre navigateur et n'est jamais envoyée à nos serveurs.
-    
-    ---
-    
-    ## 🆘 Besoin d'aide ?
-    
-    **Problème avec Serper :**
-    - Vérifiez que votre clé est bien copiée (pas d'espaces)
-    - Vérifiez que vous n'avez pas dépassé les 100 recherches/jour
-    
-    **Problème avec Google Sheets :**
-    - Vérifiez que la Sheet est bien en "Lecteur" pour "Tous les utilisateurs"
-    - Vérifiez que le lien est complet (commence par https://docs.google.com)
-    
-    **Aucun résultat trouvé :**
-    - Essayez avec des termes différents
-    - Essayez une autre région
-    - Essayez "Sur le web" au lieu de "Uniquement dans mes institutions"
-    
-    **Contactez l'équipe VDN si vous avez d'autres questions !**
-    
-    ---
-    
-    ## 📊 Statistiques de cette session
-    """)
+    st.markdown(ABOUT_MARKDOWN)
     
     # Calculer les valeurs d'abord
     num_institutions = len(st.session_state.institutions)
@@ -0,0 +1,180 @@
+"""Recherche d'événements en ligne de commande, sans Streamlit
+
+Lance une grille de recherches (requête × région × scope) avec le même moteur que
+l'application et écrit les résultats au fur et à mesure, en JSONL, CSV, calendrier ICS ou Parquet.
+
+    python batch.py --output evenements.jsonl
+    python batch.py -q "forum des métiers" -r Bretagne Normandie --output evenements.csv
+    python batch.py --scopes institutions --sheet https://docs.google.com/spreadsheets/d/... -o out.jsonl
+    python batch.py -q "forum des métiers" -r Bretagne -o out.jsonl --trace traces/
+    python batch.py -o evenements.parquet                    # grands balayages, lisible par pandas
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from engine import ACQUISITION_MODES, EVENT_TYPES, INSTITUTION_QUERY_BUDGET, REGIONS, SERPER_CACHE_TTL_HOURS, SERPER_DAILY_CREDITS, PrintLog, search_events
+from exports import open_export
+from filters import EXCLUDE_KEYWORDS, compile_filter
+from institutions import get_sheet_cache
+from tracing import Trace
+
+# Colonnes écrites pour chaque résultat : la recherche d'origine, puis les colonnes de l'application
+FIELDS = ['search_id', 'Requête', 'Région', 'Portée', 'Date', 'Événement', 'Description', 'Lien', 'Autres liens', 'Institution']
+
+
+class JsonlWriter:
+    """Écrit une ligne JSON par résultat"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class CsvWriter:
+    """Écrit un CSV (utf-8-sig, lisible directement par Excel)"""
+
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=FIELDS + ['Nouveau'], extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche d'événements universitaires en lot (API Serper)")
+    parser.add_argument('-q', '--queries', nargs='+', default=EVENT_TYPES, help="Requêtes à lancer (par défaut : les types d'événements de la recherche rapide)")
+    parser.add_argument('-r', '--regions', nargs='+', default=REGIONS[1:], help="Régions (par défaut : les 13 régions ; \"Toute la France\" est aussi accepté)")
+    parser.add_argument('-s', '--scopes', nargs='+', choices=['web', 'institutions'], default=['web'], help="Où chercher")
+    parser.add_argument('-o', '--output', required=True, help="Fichier de sortie (.jsonl, .csv, .ics ou .parquet, '-' pour la sortie standard en JSONL)")
+    parser.add_argument('-n', '--num-results', type=int, default=20, choices=[10, 20, 50], help="Nombre de résultats visé par recherche")
+    parser.add_argument('--acquisition', choices=ACQUISITION_MODES, default='variations', help="Au-delà de 10 résultats : variations de la requête, ou pages suivantes de la requête de base")
+    parser.add_argument('--api-key', default=os.environ.get('SERPER_API_KEY'), help="Clé API Serper (par défaut : variable SERPER_API_KEY)")
+    parser.add_argument('--sheet', help="Google Sheet des institutions (nécessaire pour --scopes institutions)")
+    parser.add_argument('--from', dest='min_date', type=lambda value: datetime.strptime(value, '%Y-%m-%d'), default=None, help="Ne garder que les événements à partir de cette date (AAAA-MM-JJ, par défaut : aujourd'hui)")
+    parser.add_argument('--institution-budget', type=int, default=INSTITUTION_QUERY_BUDGET, help="Requêtes max. consacrées aux institutions par recherche")
+    parser.add_argument('--daily-credits', type=int, default=SERPER_DAILY_CREDITS, help="Quota de crédits Serper par jour")
+    parser.add_argument('--fetch-dates', action='store_true', help="Chercher les dates sur les pages web")
+    parser.add_argument('--cache-ttl', type=float, default=SERPER_CACHE_TTL_HOURS, help="Durée du cache des réponses Serper (heures, 0 = pas de cache)")
+    parser.add_argument('--force-refresh', action='store_true', help="Ignorer le cache")
+    parser.add_argument('--exclude', nargs='*', default=EXCLUDE_KEYWORDS, help="Mots-clés qui écartent un résultat (par défaut : tourisme, hôtellerie...)")
+    parser.add_argument('--include', nargs='*', default=[], help="Mots-clés dont un résultat doit contenir au moins un")
+    parser.add_argument('--incremental', action='store_true', help="Reprendre la date des résultats déjà enregistrés et ajouter la colonne 'Nouveau'")
+    parser.add_argument('--jobs', type=int, default=2, help="Nombre de recherches menées en parallèle")
+    parser.add_argument('--trace', metavar='DOSSIER', help="Écrire la chronologie de chaque recherche (durées, compteurs) dans DOSSIER/<search_id>.json")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Afficher le détail de chaque recherche (mode debug)")
+    args = parser.parse_args(argv)
+
+    unknown = [region for region in args.regions if region not in REGIONS]
+    if unknown:
+        parser.error(f"région(s) inconnue(s) : {', '.join(unknown)}")
+    if not args.api_key:
+        parser.error("clé API Serper manquante (--api-key ou variable SERPER_API_KEY)")
+    if 'institutions' in args.scopes and not args.sheet:
+        parser.error("--scopes institutions nécessite --sheet")
+    return args
+
+
+def run_job(args, job, institutions):
+    """Lance une recherche de la grille et retourne ses lignes de résultats"""
+    query, region, scope = job
+    search_id = str(uuid.uuid4())[:8]
+    log = PrintLog(prefix=f"[{search_id}] ")
+    trace = Trace(search_id) if args.trace else None
+    results, _ = search_events(
+        query,
+        region,
+        args.api_key,
+        args.num_results,
+        args.fetch_dates,
+        institutions,
+        scope,
+        args.min_date,
+        args.verbose,
+        cache_ttl=args.cache_ttl * 3600,
+        force_refresh=args.force_refresh,
+        log=log,
+        institution_budget=args.institution_budget,
+        daily_credits=args.daily_credits,
+        incremental=args.incremental,
+        keyword_filter=compile_filter(tuple(args.exclude), tuple(args.include)),
+        acquisition=args.acquisition,
+        trace=trace
+    )
+    if trace:
+        trace.write(args.trace)
+    context = {'search_id': search_id, 'Requête': query, 'Région': region, 'Portée': scope}
+    return [{**context, **row} for row in results or []], results is None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    institutions = []
+    if args.sheet:
+        _, error, status = get_sheet_cache().load(args.sheet)
+        if error:
+            print(error, file=sys.stderr)
+            return 1
+        # Institutions indexées par domaine : chaque résultat est rattaché à la sienne (colonne 'Institution')
+        institutions = status['registre']
+        for line, value, reason in status['rejets']:
+            print(f"⚠️ Ligne {line} ignorée : {value} ({reason})", file=sys.stderr)
+        if status['nb_rejets'] > len(status['rejets']):
+            print(f"⚠️ ... {status['nb_rejets'] - len(status['rejets'])} autre(s) ligne(s) ignorée(s)", file=sys.stderr)
+        print(f"✅ {len(institutions)} institution(s) chargée(s)", file=sys.stderr)
+
+    jobs = list(itertools.product(args.queries, args.regions, args.scopes))
+    print(f"🔍 {len(jobs)} recherche(s) à lancer", file=sys.stderr)
+
+    extension = os.path.splitext(args.output)[1].lower()
+    if extension in ('.ics', '.parquet'):
+        # Calendrier (événements datés seulement) ou Parquet écrit par lots : fichier géré par l'export
+        stream = None
+        writer = open_export(extension[1:], args.output, FIELDS + ['Nouveau'])
+    elif args.output == '-':
+        stream = sys.stdout
+        writer = JsonlWriter(stream)
+    else:
+        stream = open(args.output, 'w', newline='', encoding='utf-8-sig' if extension == '.csv' else 'utf-8')
+        writer = CsvWriter(stream) if extension == '.csv' else JsonlWriter(stream)
+
+    failures = 0
+    written = 0
+    try:
+        # Les résultats sont écrits dès qu'une recherche se termine : seules les recherches
+        # en cours sont gardées en mémoire
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {executor.submit(run_job, args, job, institutions): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                # Retirer la recherche terminée pour libérer ses résultats une fois écrits
+                query, region, scope = futures.pop(future)
+                rows, failed = future.result()
+                failures += failed
+                for row in rows:
+                    writer.write(row)
+                written += len(rows)
+                if stream:
+                    stream.flush()
+                print(f"[{done}/{len(jobs)}] {query} · {region} · {scope} : {len(rows)} événement(s)", file=sys.stderr)
+    finally:
+        if stream is None:
+            writer.close()
+        elif stream is not sys.stdout:
+            stream.close()
+
+    print(f"✅ {written} événement(s) écrit(s), {failures} recherche(s) en erreur", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
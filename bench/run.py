@@ -0,0 +1,199 @@
+"""Micro-benchmarks hors ligne des fonctions critiques de la recherche
+
+Mesure, sur le corpus enregistré dans bench/corpus (résultats Serper et débuts de pages
+d'universités), le débit (éléments/s), les latences p50/p99 et la mémoire allouée de
+l'extraction des dates (extraits et pages web), de leur conversion, du filtre des événements passés, du filtre
+par mots-clés et du dédoublonnage (URLs canoniques, quasi-doublons), puis compare au
+dernier baseline enregistré.
+
+    python bench/run.py                  # mesure et compare au baseline
+    python bench/run.py --save-baseline  # enregistre les mesures comme nouveau baseline
+    python bench/run.py --check          # code de sortie 1 en cas de régression
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dates import extract_date, find_dates, future_mask, is_future_event, parse_date  # noqa: E402
+from dedupe import near_duplicate_groups  # noqa: E402
+from filters import EXCLUDE_KEYWORDS, compile_filter, is_excluded  # noqa: E402
+from pagedates import scan_page  # noqa: E402
+from urls import canonical_url  # noqa: E402
+
+CORPUS_DIR = os.path.join(ROOT, 'bench', 'corpus')
+BASELINE_PATH = os.path.join(ROOT, 'bench', 'baseline.json')
+
+# Date minimum fixe pour que les mesures ne dépendent pas du jour où elles sont lancées
+MIN_DATE = datetime(2025, 9, 1)
+
+
+class PageResponse:
+    """Réponse HTTP d'une page du corpus, lue par morceaux comme avec stream=True"""
+
+    headers = {'Content-Type': 'text/html; charset=utf-8'}
+
+    def __init__(self, html):
+        self.body = html.encode('utf-8')
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), chunk_size):
+            yield self.body[offset:offset + chunk_size]
+
+
+def load_corpus():
+    """Charge les résultats Serper et les pages HTML du corpus"""
+    with open(os.path.join(CORPUS_DIR, 'serper_organic.json'), encoding='utf-8') as f:
+        organic = json.load(f)
+    with open(os.path.join(CORPUS_DIR, 'pages.json'), encoding='utf-8') as f:
+        pages = json.load(f)
+    return organic, pages
+
+
+def build_cases(organic, pages):
+    """Liste des benchmarks : (nom, fonction appelée une fois par entrée, entrées, éléments par entrée, préparation d'un tour)"""
+    snippets = [item.get('snippet', '') + ' ' + item.get('title', '') for item in organic]
+    html = [page['html'] for page in pages]
+    dates = [extract_date(text) or 'Date à confirmer' for text in snippets + html]
+    items = [(item.get('title', ''), item.get('snippet', '')) for item in organic]
+    links = [item.get('link', '') for item in organic]
+    # Volume d'un balayage multi-régions (plusieurs milliers de dates)
+    sweep = dates * 50
+    # Résultats d'un balayage multi-régions : chaque annonce revient dans plusieurs régions
+    sweep_texts = [f"{title} {snippet}" for title, snippet in items] * 20
+    # Liste de filtres configurée par l'utilisateur : plusieurs centaines de règles
+    many_rules = compile_filter(tuple(f"{prefix}{suffix}" for prefix in ('bat', 'cor', 'mar', 'pel', 'ves', 'tri')
+                                      for suffix in ('ure', 'elle', 'ier', 'aison', 'ette', 'onnage', 'ement', 'isme',
+                                                     'ance', 'ité', 'age', 'ine', 'ade', 'eur', 'ise', 'ure de nuit',
+                                                     'ière', 'ot', 'erie', 'aire', 'ateur', 'elage', 'ation', 'oir',
+                                                     'ille', 'on', 'ée', 'ard', 'ique', 'ette rouge', 'eau', 'ent',
+                                                     'iste', 'aille', 'ole', 'eraie', 'ule', 'oire', 'ite', 'ume',
+                                                     'ande', 'uche', 'ouche', 'ouille', 'asse', 'oque', 'iche', 'une',
+                                                     'oise', 'ode'))
+                                + tuple(EXCLUDE_KEYWORDS))
+
+    def cold():
+        find_dates.cache_clear()
+
+    return [
+        ('extract_date (extraits)', extract_date, snippets, 1, cold),
+        ('extract_date (extraits, mémo)', extract_date, snippets, 1, None),
+        ('extract_date (pages HTML)', extract_date, html, 1, cold),
+        ('scan_page (pages HTML)', scan_page, [PageResponse(page) for page in html], 1, None),
+        ('parse_date', parse_date, dates, 1, None),
+        ('is_future_event', lambda date: is_future_event(date, MIN_DATE), dates, 1, None),
+        ('future_mask (lot)', lambda batch: future_mask(batch, MIN_DATE), [dates], len(dates), None),
+        ('future_mask (balayage)', lambda batch: future_mask(batch, MIN_DATE), [sweep], len(sweep), None),
+        ('is_excluded', lambda item: is_excluded(*item), items, 1, None),
+        (f'KeywordFilter ({len(many_rules.exclude)} règles)', lambda item: many_rules.rejection(*item), items, 1, None),
+        ('canonical_url', canonical_url, links, 1, None),
+        ('near_duplicate_groups (balayage)', near_duplicate_groups, [sweep_texts], len(sweep_texts), None),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(func, inputs, per_input, setup, min_time):
+    """Mesure un benchmark : débit, latences par appel et pic mémoire d'un tour"""
+    # Un tour de chauffe, puis des tours mesurés jusqu'à atteindre min_time
+    if setup:
+        setup()
+    for value in inputs:
+        func(value)
+
+    latencies = []
+    total = 0.0
+    rounds = 0
+    while total < min_time or rounds < 3:
+        if setup:
+            setup()
+        for value in inputs:
+            started = time.perf_counter()
+            func(value)
+            latencies.append(time.perf_counter() - started)
+        total = sum(latencies)
+        rounds += 1
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    for value in inputs:
+        func(value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'items_per_s': round(rounds * len(inputs) * per_input / total, 1),
+        'p50_us': round(percentile(latencies, 0.50) * 1e6, 2),
+        'p99_us': round(percentile(latencies, 0.99) * 1e6, 2),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks hors ligne (extraction et filtrage)")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Durée minimale de mesure par benchmark (secondes)")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistre les mesures comme nouveau baseline")
+    parser.add_argument('--check', action='store_true', help="Échoue si un débit baisse de plus de --tolerance")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Baisse de débit tolérée avant de signaler une régression (0.25 = 25 %%)")
+    parser.add_argument('--only', help="Ne lance que les benchmarks dont le nom contient ce texte")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    organic, pages = load_corpus()
+    print(f"Corpus : {len(organic)} résultats Serper, {len(pages)} pages HTML")
+    print(f"{'benchmark':<32}{'éléments/s':>14}{'p50 (µs)':>11}{'p99 (µs)':>11}{'pic (Kio)':>11}{'vs baseline':>13}")
+
+    results = {}
+    regressions = []
+    for name, func, inputs, per_input, setup in build_cases(organic, pages):
+        if args.only and args.only not in name:
+            continue
+        measure = run_case(func, inputs, per_input, setup, args.min_time)
+        results[name] = measure
+
+        comparison = ''
+        reference = baseline.get(name)
+        if reference:
+            ratio = measure['items_per_s'] / reference['items_per_s']
+            comparison = f"x{ratio:.2f}"
+            if ratio < 1 - args.tolerance:
+                comparison += ' ⚠'
+                regressions.append(name)
+        print(f"{name:<32}{measure['items_per_s']:>14,.0f}{measure['p50_us']:>11.2f}{measure['p99_us']:>11.2f}"
+              f"{measure['peak_kib']:>11.1f}{comparison:>13}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'results': results,
+            }, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"Baseline enregistré dans {os.path.relpath(BASELINE_PATH, ROOT)}")
+
+    if regressions:
+        print(f"Régression(s) de plus de {args.tolerance:.0%} : {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
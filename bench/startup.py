@@ -0,0 +1,80 @@
+"""Temps de démarrage et de réexécution de l'application Streamlit, hors ligne
+
+Lance app.py sans navigateur (streamlit.testing) et mesure :
+- le premier affichage : première exécution du script dans un processus Python neuf
+  (imports compris), médiane sur plusieurs processus ;
+- la réexécution : durée du script quand l'utilisateur coche une case de la barre latérale,
+  médiane sur plusieurs interactions (Streamlit réexécute alors tout le script ; les
+  interactions dans un onglet ne réexécutent que cet onglet, ce que streamlit.testing ne
+  reproduit pas).
+
+La session démarre avec une liste d'institutions (200 par défaut) comme si une Sheet était chargée.
+
+Aucune recherche n'est lancée : pas de clé API ni d'accès réseau nécessaires.
+
+    python bench/startup.py
+    python bench/startup.py --processes 10 --reruns 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans un processus neuf : Streamlit est importé avant la mesure, comme dans un serveur
+# déjà démarré qui reçoit sa première session
+_PROBE = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=60)
+app.session_state['institutions'] = [f'https://univ-{i}.fr' for i in range(int(sys.argv[3]))]
+started = time.perf_counter()
+app.run()
+first = time.perf_counter() - started
+
+reruns = []
+for i in range(int(sys.argv[2])):
+    checkbox = app.checkbox[0]
+    (checkbox.uncheck() if checkbox.value else checkbox.check())
+    started = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - started)
+
+modules = [name for name in ('pandas', 'numpy', 'requests') if name in sys.modules]
+print(json.dumps({'first': first, 'reruns': reruns, 'modules': modules}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de premier affichage et de réexécution de app.py")
+    parser.add_argument('--processes', type=int, default=5, help="Nombre de processus neufs (premier affichage)")
+    parser.add_argument('--reruns', type=int, default=20, help="Nombre d'interactions mesurées par processus")
+    parser.add_argument('--institutions', type=int, default=200, help="Taille de la liste d'institutions chargée dans la session")
+    args = parser.parse_args()
+
+    env = dict(os.environ, VDN_CACHE_DIR=tempfile.mkdtemp())
+    first = []
+    reruns = []
+    modules = []
+    for _ in range(args.processes):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE, os.path.join(ROOT, 'app.py'), str(args.reruns), str(args.institutions)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        measure = json.loads(output.strip().splitlines()[-1])
+        first.append(measure['first'])
+        reruns.extend(measure['reruns'])
+        modules = measure['modules']
+
+    print(f"Premier affichage  : {statistics.median(first) * 1000:8.1f} ms (médiane sur {len(first)} processus)")
+    print(f"Réexécution        : {statistics.median(reruns) * 1000:8.1f} ms (médiane sur {len(reruns)} interactions)")
+    print(f"Modules chargés sans recherche : {', '.join(modules) or 'aucun module lourd'}")
+
+
+if __name__ == '__main__':
+    main()
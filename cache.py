@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Dossier des caches locaux (surchargeable via la variable d'environnement VDN_CACHE_DIR)
+CACHE_DIR = os.environ.get(
+    'VDN_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+)
+
+
+def make_key(payload):
+    """Clé de cache stable pour un payload JSON (indépendante de l'ordre des champs)"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """Cache clé/valeur persistant sur disque (SQLite) avec expiration (TTL) et éviction LRU"""
+
+    def __init__(self, name, ttl=24 * 3600, max_entries=1000, cache_dir=None):
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, f'{name}.sqlite3')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'created REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self._conn.commit()
+
+    def get(self, key, ttl=None):
+        """Retourne la valeur en cache, ou None si absente ou expirée"""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Enregistre une valeur (sérialisable en JSON) et évince les entrées les moins récemment utilisées"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._conn.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def contains(self, key, ttl=None):
+        """Vrai si la clé est en cache et pas expirée (sans compter de hit/miss ni rafraîchir l'entrée)"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            row = self._conn.execute('SELECT created FROM entries WHERE key = ?', (key,)).fetchone()
+        return row is not None and time.time() - row[0] <= ttl
+
+    def add(self, key, amount):
+        """Incrémente un compteur (créé à 0 s'il n'existe pas) et retourne le nouveau total"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            total = (json.loads(row[0]) if row else 0) + amount
+            self._conn.execute(
+                'INSERT INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, accessed = excluded.accessed',
+                (key, json.dumps(total), now, now)
+            )
+            self._conn.commit()
+        return total
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
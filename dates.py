@@ -0,0 +1,211 @@
+import re
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+# Abréviations usuelles des mois, suivies ou non d'un point ("15 janv. 2025", "3 févr. 2026")
+MONTH_ABBREVIATIONS_FR = {
+    'janv': '01', 'jan': '01', 'févr': '02', 'fevr': '02', 'fév': '02', 'fev': '02', 'mar': '03',
+    'avr': '04', 'juil': '07', 'sept': '09', 'oct': '10', 'nov': '11', 'déc': '12', 'dec': '12'
+}
+
+# Mois en français (noms complets avant les abréviations : l'ordre compte dans l'alternance des regex)
+MONTHS_FR = {
+    'janvier': '01', 'février': '02', 'fevrier': '02', 'mars': '03', 'avril': '04',
+    'mai': '05', 'juin': '06', 'juillet': '07', 'août': '08', 'aout': '08',
+    'septembre': '09', 'octobre': '10', 'novembre': '11', 'décembre': '12', 'decembre': '12',
+    **MONTH_ABBREVIATIONS_FR
+}
+
+# Un mois n'est pas suivi d'une lettre ("mar" ne se lit pas dans "mardi") ; une abréviation peut
+# être suivie d'un point, qui fait partie du mois capturé (l'année qui suit reste lue)
+_MONTHS = ('(?:(?:' + '|'.join(name for name in MONTHS_FR if name not in MONTH_ABBREVIATIONS_FR) + ')(?![a-zà-ÿ])'
+           '|(?:' + '|'.join(MONTH_ABBREVIATIONS_FR) + r')(?![a-zà-ÿ])\.?)')
+_WEEKDAYS = '(?:lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)'
+
+# Tous les formats reconnus en une seule regex, parcourue une seule fois sur le texte.
+# À une même position, les formats les plus précis sont essayés en premier
+# ("du 15 au 17 janvier 2025" avant "17 janvier 2025", "2025-01-15" avant "25-01-15").
+# Les formats numériques sont en lookahead : ils ne consomment pas le texte, pour ne pas
+# masquer une date en toutes lettres qui chevaucherait ("3.4.25 mars"). Aucun jour ni année ne
+# commence au milieu d'un nombre ((?<!\d) : pas de "5/01/2025" dans "15/01/2025").
+DATE_PATTERN = re.compile(
+    # "du 15 au 17 janvier 2025"
+    r'(?P<range>du\s+(?P<r_day>\d{1,2})\s+au\s+(?P<r_day_end>\d{1,2})\s+(?P<r_month>' + _MONTHS + r')\s+(?P<r_year>\d{4}))'
+    # "samedi 15 janvier" ou "lundi 3 mars 2025"
+    r'|(?P<weekday>' + _WEEKDAYS + r'\s+(?P<w_day>\d{1,2})\s+(?P<w_month>' + _MONTHS + r')(?:\s+(?P<w_year>\d{4}))?)'
+    # Formats qui commencent par un chiffre, essayés seulement sur le premier chiffre d'un nombre
+    # ((?=\d) d'abord : la plupart des positions sont écartées sans autre test)
+    r'|(?=\d)(?<!\d)(?:'
+    # "15 janvier 2025" ou "15 janvier"
+    r'(?P<text>(?P<t_day>\d{1,2})\s+(?P<t_month>' + _MONTHS + r')(?:\s+(?P<t_year>\d{4}))?)'
+    # "2025-01-15" (format ISO)
+    r'|(?=(?P<iso>(?P<i_year>\d{4})[\/\-](?P<i_month>\d{1,2})[\/\-](?P<i_day>\d{1,2})))'
+    # "15/01/2025" ou "15-01-2025" ou "15.01.2025"
+    r'|(?=(?P<numeric>(?P<n_day>\d{1,2})[\/\-\.](?P<n_month>\d{1,2})[\/\-\.](?P<n_year>\d{2,4}))))'
+)
+
+# Les dates écrites en toutes lettres sont préférées aux dates numériques, où qu'elles soient dans le texte
+KIND_RANK = {'range': 0, 'weekday': 0, 'text': 0, 'iso': 1, 'numeric': 1}
+
+# Version des règles d'extraction, enregistrée avec chaque date de la base locale : à augmenter
+# quand les règles changent, pour que les dates déjà enregistrées soient extraites à nouveau
+DATE_EXTRACTION_VERSION = 1
+
+# Nombre de textes dont les dates sont mémorisées (les mêmes extraits reviennent d'une recherche à l'autre)
+DATE_MEMO_SIZE = 2048
+
+
+class DateCandidate(namedtuple('DateCandidate', 'start end kind day month year day_end')):
+    """Date repérée dans un texte : position, format, et jour/mois/année tels qu'écrits (année None si absente)"""
+    __slots__ = ()
+
+    def format(self, default_year):
+        """Date au format JJ/MM/AAAA (ou JJ-JJ/MM/AAAA pour une plage)"""
+        year = self.year or str(default_year)
+        if self.day_end:
+            return f"{self.day}-{self.day_end}/{self.month}/{year}"
+        return f"{self.day}/{self.month}/{year}"
+
+
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def find_dates(text):
+    """Retourne toutes les dates candidates du texte, dans l'ordre où elles apparaissent"""
+    if not text:
+        return ()
+
+    candidates = []
+    for match in DATE_PATTERN.finditer(text.lower()):
+        kind = match.lastgroup
+        group = match.group
+        if kind == 'range':
+            candidate = (group('r_day'), MONTHS_FR[group('r_month').rstrip('.')], group('r_year'), group('r_day_end'))
+        elif kind == 'weekday':
+            candidate = (group('w_day'), MONTHS_FR[group('w_month').rstrip('.')], group('w_year'), None)
+        elif kind == 'text':
+            candidate = (group('t_day'), MONTHS_FR[group('t_month').rstrip('.')], group('t_year'), None)
+        elif kind == 'iso':
+            candidate = (group('i_day'), group('i_month'), group('i_year'), None)
+        else:
+            candidate = (group('n_day'), group('n_month'), group('n_year'), None)
+        candidates.append(DateCandidate(match.start(kind), match.end(kind), kind, *candidate))
+    return tuple(candidates)
+
+
+def extract_date(text, memo=True):
+    """Extrait une date du texte - version améliorée
+    
+    memo=False pour un texte qui ne reviendra pas (page web) : il n'est pas gardé dans le mémo de find_dates.
+    """
+    candidates = find_dates(text) if memo else find_dates.__wrapped__(text)
+    if not candidates:
+        return None
+    best = min(candidates, key=lambda candidate: (KIND_RANK[candidate.kind], candidate.start))
+    return best.format(datetime.now().year)
+
+
+def parse_date(date_str):
+    """Convertit une date string en objet datetime pour comparaison"""
+    if not date_str or date_str == 'Date à confirmer':
+        return None
+    
+    try:
+        # Essayer différents formats
+        formats = [
+            '%d/%m/%Y',      # 15/01/2025
+            '%d/%m/%y',      # 15/01/25
+            '%m/%Y',         # 01/2025
+        ]
+        
+        # Nettoyer la date (enlever les plages "15-17/01/2025" -> prendre la première date)
+        if '-' in date_str and '/' in date_str:
+            # Format "15-17/01/2025" -> "15/01/2025"
+            parts = date_str.split('-')
+            if len(parts) > 1:
+                date_str = parts[0] + date_str[date_str.index('/'):]
+        
+        for fmt in formats:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except:
+                continue
+        
+        return None
+    except:
+        return None
+
+
+def start_of_day(min_date=None):
+    """Début de la journée de min_date (aujourd'hui par défaut)"""
+    return (min_date or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def is_future_event(date_str, min_date=None):
+    """Vérifie si un événement est futur par rapport à une date minimum"""
+    if date_str == 'Date à confirmer':
+        return True  # Garder les événements sans date confirmée
+    
+    parsed_date = parse_date(date_str)
+    if not parsed_date:
+        return True  # En cas de doute, garder
+    
+    # Utiliser la date minimum fournie, ou aujourd'hui par défaut
+    return parsed_date >= start_of_day(min_date)
+
+
+# Traitement par lots : mêmes règles que parse_date / is_future_event, appliquées à toute une colonne.
+# Les dates sont comparées sous forme d'entiers AAAAMMJJ (pas de limite d'années comme avec datetime),
+# avec le seuil calculé une seule fois. Une boucle sur des expressions régulières compilées est plus
+# rapide que pandas/numpy aux tailles d'une recherche (quelques dizaines à quelques milliers de dates) :
+# voir "future_mask (lot)" et "future_mask (balayage)" dans bench/baseline.json.
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Formats acceptés par parse_date : JJ/MM/AAAA, JJ/MM/AA, MM/AAAA
+_DATE_PARTS = re.compile(r'^(?:(?P<day>[1-9]|0[1-9]|[12]\d|3[01])/)?(?P<month>[1-9]|0[1-9]|1[0-2])/(?P<year>\d{4}|\d{2})$')
+# Plage de jours ("15-17/01/2025") : seul le premier jour compte
+_DATE_RANGE = re.compile(r'^([^-/]*)-[^/]*(?=/)')
+
+
+def date_key(date_str):
+    """Date sous forme d'entier AAAAMMJJ, ou None si elle est illisible ou impossible ("Date à confirmer", 31/02/2025...)"""
+    if not date_str:
+        return None
+    if '-' in date_str:
+        date_str = _DATE_RANGE.sub(r'\1', date_str, count=1)
+    match = _DATE_PARTS.match(date_str)
+    if not match:
+        return None
+    day, month, year_str = match.group('day', 'month', 'year')
+    month = int(month)
+    year = int(year_str)
+    if len(year_str) == 2:
+        if day is None:
+            return None  # "01/25" n'est pas une date
+        # Années sur deux chiffres comme strptime (%y) : 69-99 -> 19xx, 00-68 -> 20xx
+        year += 2000 if year < 69 else 1900
+    if year < 1:
+        return None
+    day = int(day) if day else 1
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if day > DAYS_IN_MONTH[month - 1] + (month == 2 and leap):
+        return None
+    return year * 10000 + month * 100 + day
+
+
+def date_keys(dates):
+    """Convertit une colonne de dates en entiers AAAAMMJJ
+    
+    Retourne (clés, valides) : valides est faux pour les dates illisibles ou impossibles
+    (leur clé vaut alors 0).
+    """
+    keys = [date_key(date) for date in dates]
+    return [key or 0 for key in keys], [key is not None for key in keys]
+
+
+def future_mask(dates, min_date=None):
+    """Version par lots de is_future_event : liste de booléens des événements à garder
+    
+    Les dates illisibles ou "Date à confirmer" sont gardées, comme dans is_future_event.
+    """
+    threshold = start_of_day(min_date)
+    threshold = threshold.year * 10000 + threshold.month * 100 + threshold.day
+    return [key is None or key >= threshold for key in map(date_key, dates)]
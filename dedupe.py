@@ -0,0 +1,96 @@
+import re
+import zlib
+
+from filters import fold_accents
+
+# Détection des quasi-doublons (même événement annoncé sur plusieurs pages) par MinHash :
+# chaque texte est réduit à une signature de NUM_HASHES minima, et seuls les textes qui
+# partagent une bande entière de la signature (LSH) sont comparés. Le coût est linéaire
+# en nombre de textes, au lieu de comparer toutes les paires.
+NUM_HASHES = 32
+BANDS = 8
+ROWS_PER_BAND = NUM_HASHES // BANDS
+# Similarité de Jaccard estimée (part des minima égaux) à partir de laquelle deux textes sont des doublons
+# (assez haute pour ne pas regrouper les annonces types de deux établissements différents)
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# Nombre de mots par fragment comparé
+SHINGLE_SIZE = 2
+# Textes dont les signatures sont calculées ensemble
+SIGNATURE_BLOCK = 512
+
+_WORD = re.compile(r'\w+')
+# Coefficients fixes : les signatures sont les mêmes d'une exécution à l'autre
+_MASK = (1 << 64) - 1
+_SEEDS = [((0x9E3779B97F4A7C15 * (i + 1)) & _MASK | 1, (0xC2B2AE3D27D4EB4F * (i + 7)) & _MASK) for i in range(NUM_HASHES)]
+
+
+def shingles(text):
+    """Empreintes (crc32) des suites de SHINGLE_SIZE mots du texte, accents et casse ignorés"""
+    words = _WORD.findall(fold_accents(text))
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(word.encode()) for word in words}
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode())
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signatures(texts):
+    """Signatures MinHash (une ligne de NUM_HASHES entiers par texte), calculées par blocs de textes"""
+    import numpy as np
+
+    a = np.array([seed[0] for seed in _SEEDS], dtype=np.uint64)[:, None]
+    b = np.array([seed[1] for seed in _SEEDS], dtype=np.uint64)[:, None]
+    blocks = []
+    # Par blocs : la matrice intermédiaire (NUM_HASHES x fragments) reste de taille bornée
+    for offset in range(0, len(texts), SIGNATURE_BLOCK):
+        sets = [shingles(text) for text in texts[offset:offset + SIGNATURE_BLOCK]]
+        # Texte sans mot : une empreinte propre à sa position, pour qu'il ne ressemble à aucun autre
+        sets = [values or {0x100000000 + offset + i} for i, values in enumerate(sets)]
+        lengths = np.fromiter((len(values) for values in sets), dtype=np.int64, count=len(sets))
+        hashes = np.fromiter((value for values in sets for value in values), dtype=np.uint64, count=int(lengths.sum()))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        # Hachage multiplicatif (modulo 2**64), puis minimum de chaque texte pour chaque fonction
+        permuted = (a * hashes[None, :] + b) >> np.uint64(32)
+        blocks.append(np.minimum.reduceat(permuted, starts, axis=1).T)
+    return np.ascontiguousarray(np.concatenate(blocks))
+
+
+def near_duplicate_groups(texts, dates=None):
+    """Numéro de groupe de chaque texte : les quasi-doublons partagent le numéro du premier d'entre eux
+
+    dates (facultatif, une par texte, None si inconnue) empêche de regrouper des textes
+    semblables mais datés différemment (même annonce type pour deux écoles, deux éditions...).
+    """
+    if not texts:
+        return []
+    signatures = minhash_signatures(texts)
+    parent = list(range(len(texts)))
+    group_date = list(dates) if dates else [None] * len(texts)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(BANDS):
+        buckets = {}
+        columns = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        for i, key in enumerate(row.tobytes() for row in columns):
+            first = buckets.setdefault(key, i)
+            if first == i:
+                continue
+            root_i, root_first = find(i), find(first)
+            if root_i == root_first:
+                continue
+            if group_date[root_i] and group_date[root_first] and group_date[root_i] != group_date[root_first]:
+                continue
+            if (signatures[i] == signatures[first]).mean() < NEAR_DUPLICATE_THRESHOLD:
+                continue
+            # Le groupe est représenté par son texte le plus ancien dans la liste
+            keep, merged = min(root_i, root_first), max(root_i, root_first)
+            parent[merged] = keep
+            group_date[keep] = group_date[keep] or group_date[merged]
+
+    return [find(i) for i in range(len(texts))]
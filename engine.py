@@ -0,0 +1,870 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain, zip_longest
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from cache import DiskCache, make_key
+from dates import extract_date, future_mask, is_future_event, start_of_day
+from dedupe import near_duplicate_groups
+from filters import compile_filter
+from institutions import InstitutionRegistry, institution_domains, plan_site_queries
+from pagedates import CONFIDENT_SOURCES, scan_page
+from results import DEBUG_COLUMNS, EventRecord, ResultTable, ResultView, result_columns
+from scheduler import RequestScheduler
+from store import ResultStore
+from tracing import NULL_TRACE
+from urls import canonical_url
+
+# API Serper
+SERPER_URL = 'https://google.serper.dev/search'
+# Nombre maximum de requêtes Serper envoyées en parallèle
+SERPER_MAX_WORKERS = 5
+# Cache des réponses Serper : durée de validité par défaut et nombre maximum d'entrées
+SERPER_CACHE_TTL_HOURS = 24
+SERPER_CACHE_MAX_ENTRIES = 2000
+# Quota de crédits Serper par jour (offre gratuite), débit maximum (requêtes/s) et nouvelles tentatives (429/5xx)
+SERPER_DAILY_CREDITS = 100
+SERPER_RATE_PER_SECOND = 5
+SERPER_MAX_RETRIES = 3
+
+# Recherche des dates sur les pages web : pages consultées en parallèle, connexions
+# simultanées par site, délai global de l'étape et délai par page (secondes)
+PAGE_FETCH_MAX_WORKERS = 8
+PAGE_FETCH_PER_HOST = 2
+PAGE_FETCH_DEADLINE = 15
+PAGE_FETCH_TIMEOUT = 3
+
+# Cache des pages web : dates réutilisées sans requête pendant PAGE_CACHE_FRESH_HOURS puis revalidées
+# (If-None-Match / If-Modified-Since) ; les pages sans date ou en erreur ne sont pas re-consultées
+# pendant PAGE_CACHE_NEGATIVE_HOURS
+PAGE_CACHE_FRESH_HOURS = 12
+PAGE_CACHE_NEGATIVE_HOURS = 6
+PAGE_CACHE_RETENTION_DAYS = 30
+PAGE_CACHE_MAX_ENTRIES = 5000
+
+# Résultats complets des recherches (lancées dans l'application ou pré-calculées par prewarm.py) :
+# une même recherche y est reprise sans appel à Serper tant qu'ils ont moins de SEARCH_RESULTS_MAX_AGE_HOURS
+SEARCH_RESULTS_MAX_AGE_HOURS = 12
+SEARCH_RESULTS_MAX_ENTRIES = 500
+
+# Nombre maximum de requêtes consacrées aux institutions par recherche ciblée ; quand la liste
+# ne tient pas dans ce budget, les recherches suivantes reprennent là où la précédente s'est arrêtée
+INSTITUTION_QUERY_BUDGET = 5
+
+# Régions proposées (la première couvre toute la France)
+REGIONS = [
+    "Toute la France",
+    "Auvergne-Rhône-Alpes",
+    "Bourgogne-Franche-Comté",
+    "Bretagne",
+    "Centre-Val de Loire",
+    "Corse",
+    "Grand Est",
+    "Hauts-de-France",
+    "Île-de-France",
+    "Normandie",
+    "Nouvelle-Aquitaine",
+    "Occitanie",
+    "Pays de la Loire",
+    "Provence-Alpes-Côte d'Azur"
+]
+
+# Obtention des résultats au-delà de 10 : variations de la requête, ou pages suivantes de la requête de base
+ACQUISITION_MODES = ["variations", "pages"]
+SERPER_PAGE_SIZE = 10
+# Mode "pages" : on arrête de paginer quand une page apporte moins de nouveaux liens que ce seuil
+PAGINATION_MIN_NEW_RESULTS = 3
+
+# Types d'événements de la recherche rapide
+EVENT_TYPES = ["forum des métiers", "journée orientation", "portes ouvertes", "journée découverte"]
+
+
+class SearchLog:
+    """Destination des messages et de l'avancement d'une recherche (par défaut : rien n'est affiché)
+    
+    L'interface Streamlit et la ligne de commande fournissent chacune leur sous-classe.
+    """
+    
+    def info(self, message):
+        pass
+    
+    def warning(self, message):
+        pass
+    
+    def error(self, message):
+        pass
+    
+    def table(self, title, rows):
+        """Tableau de détails (liste de dicts), affiché en mode debug"""
+        pass
+    
+    def progress(self, done, total, message):
+        """Avancement d'une étape : done sur total"""
+        pass
+    
+    def partial(self, rows):
+        """Résultats provisoires (mêmes colonnes que les résultats filtrés), remplacés à chaque appel
+        
+        Appelé à chaque réponse Serper et à chaque page web consultée, avant le résultat final.
+        """
+        pass
+
+
+class PrintLog(SearchLog):
+    """Messages écrits sur la sortie d'erreur (utilisation en ligne de commande)"""
+    
+    def __init__(self, prefix='', stream=None):
+        self.prefix = prefix
+        self.stream = stream or sys.stderr
+    
+    def _write(self, message):
+        print(f"{self.prefix}{message}", file=self.stream, flush=True)
+    
+    def info(self, message):
+        self._write(message)
+    
+    def warning(self, message):
+        self._write(message)
+    
+    def error(self, message):
+        self._write(message)
+    
+    def table(self, title, rows):
+        self._write(title)
+        for row in rows:
+            self._write('  ' + ' | '.join(str(value) for value in row.values()))
+
+
+@lru_cache(maxsize=None)
+def get_http_session():
+    """Session HTTP partagée par tout le processus (connexions keep-alive réutilisées)
+    
+    requests n'est importé qu'ici, à la première recherche.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(SERPER_MAX_WORKERS, PAGE_FETCH_MAX_WORKERS))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+@lru_cache(maxsize=None)
+def get_serper_cache():
+    """Cache disque des réponses Serper, partagé par tout le processus"""
+    return DiskCache('serper', ttl=SERPER_CACHE_TTL_HOURS * 3600, max_entries=SERPER_CACHE_MAX_ENTRIES)
+
+@lru_cache(maxsize=None)
+def get_page_cache():
+    """Cache disque des dates trouvées sur les pages web, partagé par tout le processus"""
+    return DiskCache('pages', ttl=PAGE_CACHE_RETENTION_DAYS * 24 * 3600, max_entries=PAGE_CACHE_MAX_ENTRIES)
+
+@lru_cache(maxsize=None)
+def get_scheduler():
+    """Ordonnanceur des appels Serper (débit, nouvelles tentatives, crédits du jour), partagé par tout le processus"""
+    credits = DiskCache('credits', ttl=2 * 24 * 3600, max_entries=30)
+    return RequestScheduler(credits, SERPER_RATE_PER_SECOND, SERPER_MAX_WORKERS, max_retries=SERPER_MAX_RETRIES)
+
+@lru_cache(maxsize=None)
+def get_result_store():
+    """Base locale des résultats déjà trouvés, partagée par tout le processus"""
+    return ResultStore()
+
+@lru_cache(maxsize=None)
+def get_search_results_cache():
+    """Résultats des recherches complètes, partagés par tous les processus (application et prewarm.py)"""
+    return DiskCache('searches', ttl=SEARCH_RESULTS_MAX_AGE_HOURS * 3600, max_entries=SEARCH_RESULTS_MAX_ENTRIES)
+
+@lru_cache(maxsize=None)
+def get_rotation_state():
+    """Position de reprise dans chaque liste d'institutions trop longue pour une seule recherche"""
+    return DiskCache('rotation', ttl=365 * 24 * 3600, max_entries=200)
+
+def lookup_page_date(url, session=None, timeout=PAGE_FETCH_TIMEOUT, cache=None, revalidate=False, trace=NULL_TRACE):
+    """Cherche la date d'une page web en passant par le cache des pages
+    
+    Retourne (date ou None, origine, source de la date, octets lus) ; l'origine vaut 'réseau', 'cache',
+    'cache (304)', 'cache (négatif)' ou 'cache (échec)', la source est l'une de pagedates.SOURCES (None sans date).
+    Avec revalidate=True, les entrées du cache sont toujours revalidées auprès du site ; si la revalidation
+    échoue (délai dépassé, erreur HTTP), la date déjà enregistrée est gardée.
+    """
+    entry = cache.get(url) if cache is not None else None
+    now = time.time()
+    headers = {}
+    if entry:
+        age = now - entry['checked']
+        if not revalidate and entry['date'] is None and age < PAGE_CACHE_NEGATIVE_HOURS * 3600:
+            return None, 'cache (négatif)', None, 0
+        if not revalidate and entry['date'] and age < PAGE_CACHE_FRESH_HOURS * 3600:
+            return entry['date'], 'cache', entry.get('source'), 0
+        if entry['date']:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+    
+    date = None
+    source = None
+    bytes_read = 0
+    origin = 'réseau'
+    validators = {}
+    answered = False
+    try:
+        # Corps lu au fil de l'eau (stream=True) : la lecture s'arrête dès que la date est trouvée
+        with (session or get_http_session()).get(url, timeout=timeout, headers=headers, stream=True) as response:
+            trace.count('pages web : requêtes')
+            if response.status_code == 304 and headers:
+                # Page inchangée : la date enregistrée reste valable
+                date, source = entry['date'], entry.get('source')
+                validators = {'etag': entry.get('etag'), 'last_modified': entry.get('last_modified')}
+                origin = 'cache (304)'
+                answered = True
+            elif response.status_code == 200:
+                date, source, bytes_read = scan_page(response)
+                trace.count('pages web : octets', bytes_read)
+                validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+                answered = True
+    except Exception:
+        pass
+    
+    if not answered and entry and entry['date']:
+        # Revalidation impossible : la date connue reste valable, seule l'heure de vérification change
+        cache.set(url, {**entry, 'checked': now})
+        return entry['date'], 'cache (échec)', entry.get('source'), 0
+    
+    # Les échecs (délai dépassé, erreur HTTP, aucune date) sont aussi mémorisés
+    if cache is not None:
+        cache.set(url, {'date': date, 'source': source, 'checked': now, **validators})
+    return date, origin, source, bytes_read
+
+def extract_date_from_url(url, session=None, timeout=PAGE_FETCH_TIMEOUT, cache=None):
+    """Tente d'extraire une date en allant chercher sur la page web"""
+    return lookup_page_date(url, session, timeout, cache)[0]
+
+def fetch_page_dates(urls, session=None, cache=None, revalidate=False, max_workers=PAGE_FETCH_MAX_WORKERS, per_host=PAGE_FETCH_PER_HOST, deadline=PAGE_FETCH_DEADLINE, on_page=None, trace=NULL_TRACE):
+    """Cherche les dates de plusieurs pages web en parallèle, dans un délai global
+    
+    Retourne les dates trouvées (par URL) et le détail du temps passé sur chaque page.
+    Les pages qui n'ont pas répondu avant la fin du délai sont abandonnées.
+    on_page(pages terminées, total, url, date) est appelé dans le thread appelant à chaque page terminée.
+    """
+    if not urls:
+        return {}, []
+    
+    deadline_at = time.monotonic() + deadline
+    stop = threading.Event()
+    
+    # Limiter le nombre de connexions simultanées vers un même site
+    by_host = {}
+    for url in urls:
+        by_host.setdefault(urlsplit(url).hostname, []).append(url)
+    host_slots = {host: threading.BoundedSemaphore(per_host) for host in by_host}
+    
+    def fetch(url):
+        """Retourne (date, origine, source, octets lus, durée en secondes), ou None si la page a été abandonnée"""
+        slot = host_slots[urlsplit(url).hostname]
+        remaining = deadline_at - time.monotonic()
+        if stop.is_set() or remaining <= 0 or not slot.acquire(timeout=remaining):
+            return None
+        try:
+            remaining = deadline_at - time.monotonic()
+            if stop.is_set() or remaining <= 0:
+                return None
+            started = time.monotonic()
+            with trace.span('page web', url=url) as details:
+                date, origin, source, bytes_read = lookup_page_date(url, session, min(PAGE_FETCH_TIMEOUT, remaining), cache, revalidate, trace)
+                details.update(origine=origin, source=source, octets=bytes_read)
+            return date, origin, source, bytes_read, time.monotonic() - started
+        finally:
+            slot.release()
+    
+    # Alterner les sites pour ne pas occuper tous les workers avec le même site
+    ordered = [url for url in chain.from_iterable(zip_longest(*by_host.values())) if url]
+    
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)))
+    futures = {url: executor.submit(fetch, url) for url in ordered}
+    urls_by_future = {future: url for url, future in futures.items()}
+    pending = set(futures.values())
+    finished_count = 0
+    while pending and time.monotonic() < deadline_at:
+        finished, pending = wait(pending, timeout=deadline_at - time.monotonic(), return_when=FIRST_COMPLETED)
+        for future in finished:
+            finished_count += 1
+            if on_page:
+                outcome = future.result()
+                on_page(finished_count, len(urls), urls_by_future[future], outcome[0] if outcome else None)
+    # Abandonner les pages encore en attente (celles en cours finissent dans leur propre délai)
+    stop.set()
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    dates = {}
+    timings = []
+    for url in urls:
+        future = futures[url]
+        outcome = future.result() if future.done() and not future.cancelled() else None
+        trace.count(f"pages web : {outcome[1] if outcome else 'abandonnées'}")
+        if outcome is None:
+            timings.append({'Lien': url, 'Durée (s)': None, 'Origine': None, 'Résultat': 'Abandonnée (délai dépassé)', 'Source': None, 'Octets lus': 0})
+            continue
+        date, origin, source, bytes_read, elapsed = outcome
+        if date:
+            dates[url] = date
+        timings.append({'Lien': url, 'Durée (s)': round(elapsed, 2), 'Origine': origin, 'Résultat': date or 'Aucune date',
+                        'Source': source, 'Octets lus': bytes_read})
+    
+    return dates, timings
+
+def enrich_results(records, fetch_dates_from_web=False, min_date=None, fetch_excluded=False, session=None, page_cache=None, revalidate=False, known_dates=None, on_page=None, keyword_filter=None, trace=NULL_TRACE):
+    """Calcule en une passe la date, l'exclusion par mots-clés et le caractère futur de chaque résultat
+    
+    records (EventRecord) sont complétés sur place. keyword_filter (filters.KeywordFilter, filtre par
+    défaut si absent) donne la règle qui rejette chaque résultat (rejected_by, None s'il est gardé).
+    known_dates ({lien: date}) donne la date des résultats déjà enregistrés : elle est reprise
+    telle quelle, sans extraction ni consultation de la page ("Date à confirmer", ou None pour une
+    date extraite avec d'autres règles ou sans les pages, n'est pas reprise : la date est cherchée à nouveau).
+    on_page est transmis à fetch_page_dates.
+    Retourne les résultats et le temps passé sur chaque page web consultée.
+    """
+    known_dates = {link: date for link, date in (known_dates or {}).items() if date and date != 'Date à confirmer'}
+    keyword_filter = keyword_filter or compile_filter()
+    
+    # Filtrer les résultats non pertinents
+    with trace.span('filtrage (mots-clés)', résultats=len(records)):
+        for record in records:
+            record.rejected_by = keyword_filter.rejection(record.title, record.snippet)
+    
+    with trace.span('extraction des dates', résultats=len(records)):
+        for record in records:
+            record.date = known_dates[record.link] if record.link in known_dates else extract_date(record.snippet + ' ' + record.title)
+    
+    # Si pas de date trouvée et option activée, chercher sur les pages (en parallèle, une seule fois par URL)
+    fetch_timings = []
+    if fetch_dates_from_web:
+        urls = list(dict.fromkeys(
+            record.link for record in records
+            if not record.date and record.link and (fetch_excluded or not record.excluded)
+        ))
+        with trace.span('pages web', pages=len(urls)):
+            page_dates, fetch_timings = fetch_page_dates(urls, session=session, cache=page_cache, revalidate=revalidate, on_page=on_page, trace=trace)
+        for record in records:
+            if not record.date:
+                record.date = page_dates.get(record.link)
+    
+    for record in records:
+        record.date = record.date or 'Date à confirmer'
+    
+    # Filtre des événements passés calculé sur toute la colonne de dates en une fois
+    with trace.span('événements passés', résultats=len(records)):
+        keep = future_mask([record.date for record in records], min_date)
+    for record, future in zip(records, keep):
+        record.future = bool(future)
+    
+    return records, fetch_timings
+
+def preview_rows(records, min_date=None, page_dates=None, keyword_filter=None):
+    """Lignes provisoires affichées pendant la recherche (ResultView)
+    
+    Même filtrage que le résultat final, avec la date de l'extrait ou celle des pages déjà
+    consultées (page_dates), sans attendre les autres.
+    """
+    page_dates = page_dates or {}
+    keyword_filter = keyword_filter or compile_filter()
+    kept = []
+    for record in records:
+        if keyword_filter.is_excluded(record.title, record.snippet):
+            continue
+        date = extract_date(record.snippet + ' ' + record.title) or page_dates.get(record.link) or 'Date à confirmer'
+        if is_future_event(date, min_date):
+            preview = EventRecord(record.title, record.snippet, record.link, record.query)
+            preview.date = date
+            kept.append(preview)
+    return ResultTable.from_records(kept).view()
+
+def merge_responses(responses, queries=None):
+    """Résultats organiques (EventRecord) de plusieurs réponses Serper, sans doublons d'URL, dans l'ordre des réponses
+    
+    queries donne la requête de chaque réponse (gardée avec ses résultats). Les URLs sont comparées
+    sous forme canonique (http/https, www, utm_*, ancres... ignorés).
+    """
+    merged = []
+    seen_urls = set()
+    for data, query in zip_longest(responses, queries or (), fillvalue=''):
+        for item in (data or {}).get('organic', []):
+            url = item.get('link', '')
+            # Éviter les doublons
+            if url and canonical_url(url) not in seen_urls:
+                seen_urls.add(canonical_url(url))
+                merged.append(EventRecord.from_item(item, query))
+    return merged
+
+def collapse_duplicates(records):
+    """Regroupe les quasi-doublons (même événement annoncé sur plusieurs pages)
+    
+    Le premier résultat de chaque groupe est gardé, avec les liens des autres dans alternates
+    (et leur date s'il n'en avait pas). Deux résultats datés différemment ne sont jamais regroupés.
+    Retourne les positions (dans records) des résultats gardés.
+    """
+    groups = near_duplicate_groups(
+        [record.title + ' ' + record.snippet for record in records],
+        [None if record.date == 'Date à confirmer' else record.date for record in records]
+    )
+    kept = {}
+    for position, (record, group) in enumerate(zip(records, groups)):
+        if group not in kept:
+            kept[group] = position
+            continue
+        representative = records[kept[group]]
+        representative.alternates.append(record.link)
+        if representative.date == 'Date à confirmer':
+            representative.date = record.date
+    return list(kept.values())
+
+def plan_institution_queries(query, domains, year, max_queries, advance=True):
+    """Requêtes "site:" couvrant le plus d'institutions possible dans le budget
+    
+    Si toute la liste ne tient pas dans max_queries requêtes, la couverture tourne d'une
+    recherche à l'autre (position de reprise mémorisée par liste d'institutions).
+    Avec advance=False, la position de reprise n'est pas modifiée (estimation sans recherche).
+    Retourne (requêtes, domaines couverts).
+    """
+    queries, covered = plan_site_queries(query, domains, year, max_queries)
+    if len(covered) == len(domains):
+        return queries, covered
+    
+    rotation = get_rotation_state()
+    key = make_key({'domains': domains})
+    offset = rotation.get(key) or 0
+    queries, covered = plan_site_queries(query, domains, year, max_queries, offset)
+    if advance:
+        rotation.set(key, (offset + len(covered)) % len(domains))
+    return queries, covered
+
+def build_variations(query, region, num_results=20, institutions=None, search_scope="web", year=None, institution_budget=INSTITUTION_QUERY_BUDGET, advance=True, acquisition="variations"):
+    """Variations de la requête envoyées à Serper selon le nombre de résultats demandé et le scope
+    
+    En mode "pages", la recherche web n'envoie que la requête de base (et les institutions) :
+    les résultats suivants viennent des pages suivantes (voir pages_needed).
+    Retourne (requêtes, domaines d'institutions couverts).
+    """
+    region_part = region if region != "Toute la France" else ""
+    year = year or datetime.now().year
+    domains = institution_domains(institutions or [])
+    
+    variations = []
+    covered = []
+    
+    # Si recherche ciblée sur institutions : les sites sont regroupés par requête ("site:a OR site:b ...")
+    if search_scope == "institutions" and domains:
+        variations, covered = plan_institution_queries(query, domains, year, institution_budget, advance)
+    
+    # Recherche web standard (avec priorité institutions si disponibles)
+    else:
+        if num_results <= 10 or acquisition == "pages":
+            # Une seule recherche
+            base = f'{query} {region_part if region_part else "France"} {year}'
+            
+            # Ajouter les institutions en priorité (autant que peut en contenir une requête)
+            if domains:
+                variations, covered = plan_institution_queries(query, domains, year, 1, advance)
+                variations.append(base)
+            else:
+                variations = [base]
+        
+        elif num_results <= 30:
+            base = f'{query} {region_part if region_part else "France"} {year}'
+            variations = [
+                base,
+                f'{query} université {region_part if region_part else "France"} {year}',
+                f'{query} "école ingénieurs" {region_part if region_part else "France"} {year}'
+            ]
+        else:
+            base = f'{query} {region_part if region_part else "France"} {year}'
+            variations = [
+                base,
+                f'{query} université {region_part if region_part else "France"} {year}',
+                f'{query} "école ingénieurs" {region_part if region_part else "France"} {year}',
+                f'{query} IUT {region_part if region_part else "France"} {year}',
+                f'{query} étudiant {region_part if region_part else "France"} {year}'
+            ]
+    
+    return variations, covered
+
+def variation_priorities(variations):
+    """Priorité d'envoi de chaque variation quand les crédits manquent (0 = la plus utile)
+    
+    0 : la requête de base, 1 : les requêtes sur les institutions, 2 : les variations complémentaires.
+    """
+    base = next((full_query for full_query in variations if 'site:' not in full_query), None)
+    return [0 if full_query == base else 1 if 'site:' in full_query else 2 for full_query in variations]
+
+def serper_payload(full_query, page=1):
+    """Corps de la requête Serper (et clé du cache des réponses)"""
+    payload = {
+        'q': full_query,
+        'gl': 'fr',
+        'hl': 'fr'
+    }
+    if page > 1:
+        payload['page'] = page
+    return payload
+
+def needs_credit(full_query, cache_ttl, force_refresh, page=1):
+    """Vrai si la requête partira vers Serper (pas de réponse valide en cache)"""
+    if cache_ttl <= 0 or force_refresh:
+        return True
+    return not get_serper_cache().contains(make_key(serper_payload(full_query, page)), ttl=cache_ttl)
+
+def pages_needed(search_scope, num_results, acquisition):
+    """Nombre maximal de pages de la requête de base (1 sauf en mode "pages" sur le web)"""
+    if acquisition != "pages" or search_scope == "institutions":
+        return 1
+    return max(1, -(-num_results // SERPER_PAGE_SIZE))
+
+def estimate_cost(query, region, num_results=20, institutions=None, search_scope="web", cache_ttl=SERPER_CACHE_TTL_HOURS * 3600, force_refresh=False, institution_budget=INSTITUTION_QUERY_BUDGET, acquisition="variations"):
+    """Estime une recherche sans la lancer : (nombre de requêtes, crédits Serper consommés)
+    
+    En mode "pages", toutes les pages sont comptées (la pagination peut s'arrêter avant).
+    """
+    variations, _ = build_variations(query, region, num_results, institutions, search_scope, institution_budget=institution_budget, advance=False, acquisition=acquisition)
+    requests_list = [(full_query, 1) for full_query in variations]
+    base = next((full_query for full_query in variations if 'site:' not in full_query), None)
+    if base:
+        requests_list += [(base, page) for page in range(2, pages_needed(search_scope, num_results, acquisition) + 1)]
+    return len(requests_list), sum(1 for full_query, page in requests_list if needs_credit(full_query, cache_ttl, force_refresh, page))
+
+def search_key(query, region, num_results=20, fetch_dates_from_web=False, institutions=None, search_scope="web", keyword_filter=None, acquisition="variations", institution_budget=INSTITUTION_QUERY_BUDGET):
+    """Clé des résultats d'une recherche : tous les paramètres qui changent les résultats, sauf la date minimum
+    
+    La position de reprise des institutions en fait partie : quand la liste ne tient pas dans le budget,
+    la recherche suivante porte sur d'autres institutions et n'est pas servie par les résultats enregistrés.
+    """
+    keyword_filter = keyword_filter or compile_filter()
+    listed = institution_domains(institutions or [])
+    domains = sorted(listed)
+    # Même clé que plan_institution_queries (domaines dans l'ordre de la liste)
+    rotation = (get_rotation_state().get(make_key({'domains': listed})) or 0) if listed else 0
+    return make_key({
+        'query': query,
+        'region': region,
+        'num_results': num_results,
+        'fetch_dates': bool(fetch_dates_from_web),
+        'domains': domains,
+        # Sans institution, la recherche ciblée est une recherche web (voir build_variations)
+        'scope': search_scope if domains else "web",
+        'exclude': sorted(keyword_filter.exclude),
+        'include': sorted(keyword_filter.include),
+        'acquisition': acquisition,
+        'institution_budget': institution_budget,
+        'rotation': rotation
+    })
+
+def saved_results(key, min_date=None, incremental=False, max_age=SEARCH_RESULTS_MAX_AGE_HOURS * 3600):
+    """Résultats enregistrés d'une recherche, filtrés à partir de min_date
+    
+    Retourne (ResultView, horodatage du calcul), ou (None, None) si la recherche n'a pas été faite
+    depuis max_age secondes ou l'a été avec une date minimum plus tardive (événements manquants).
+    Avec incremental=True, la colonne 'Nouveau' est recalculée avec la base locale : comme pour une
+    recherche relancée, seuls les résultats apparus après ce calcul (ou absents de la base) sont signalés.
+    """
+    entry = get_search_results_cache().get(key, ttl=max_age)
+    # Entrées d'avant le stockage par colonnes ('results') : recalculées
+    if entry is None or 'table' not in entry or entry['min_date'] > start_of_day(min_date).isoformat():
+        return None, None
+    saved = ResultView.from_columns(entry['table'])
+    keep = future_mask(saved.column('Date'), min_date)
+    columns = [name for name in saved.columns if name != 'Nouveau']
+    if incremental:
+        links = saved.column('Lien')
+        first_seen = get_result_store().first_seen(links)
+        saved.table.columns['Nouveau'] = [
+            '🆕' if link and first_seen.get(link, entry['created']) >= entry['created'] else '' for link in links
+        ]
+        columns.append('Nouveau')
+    return saved.table.view([i for i, kept in enumerate(keep) if kept], columns), entry['created']
+
+def save_results(key, rows, min_date=None):
+    """Enregistre les résultats d'une recherche (ResultView calculée à partir de min_date), colonne par colonne"""
+    get_search_results_cache().set(key, {
+        'created': time.time(),
+        'min_date': start_of_day(min_date).isoformat(),
+        'table': rows.to_columns()
+    })
+
+def search_events(query, region, api_key, num_results=20, fetch_dates_from_web=False, institutions=None, search_scope="web", min_date=None, debug=False, cache_ttl=SERPER_CACHE_TTL_HOURS * 3600, force_refresh=False, log=None, institution_budget=INSTITUTION_QUERY_BUDGET, daily_credits=SERPER_DAILY_CREDITS, incremental=False, keyword_filter=None, acquisition="variations", trace=None):
+    """Recherche les événements via Serper API avec requêtes multiples
+    
+    Les messages (erreurs, et détails en mode debug) sont transmis à log (voir SearchLog).
+    Tous les résultats sont enregistrés dans la base locale, et le tableau final est gardé pour
+    saved_results (clé search_key) ; en mode incrémental, les résultats
+    déjà enregistrés reprennent leur date sans extraction et les nouveaux sont signalés (colonne 'Nouveau').
+    keyword_filter (filters.KeywordFilter) remplace le filtre par mots-clés par défaut ; en mode debug,
+    la colonne 'Rejeté par' des résultats bruts indique la règle qui a écarté chaque résultat.
+    acquisition (voir ACQUISITION_MODES) choisit comment obtenir plus de 10 résultats : variations de
+    la requête, ou pages suivantes de la requête de base tant qu'elles apportent de nouveaux liens.
+    trace (tracing.Trace) reçoit la durée de chaque étape et les compteurs de la recherche.
+    institutions est une liste d'URLs ou un institutions.InstitutionRegistry (noms, régions et types
+    lus dans la Sheet) ; chaque résultat est rattaché à son institution (colonne 'Institution').
+    Retourne (résultats filtrés, résultats bruts en mode debug), deux ResultView de la même table
+    (la vue brute a en plus les colonnes 'Requête Serper' et 'Rejeté par'), ou (None, None) en cas d'erreur.
+    """
+    log = log or SearchLog()
+    keyword_filter = keyword_filter or compile_filter()
+    trace = trace or NULL_TRACE
+    if not api_key:
+        log.error("⚠️ Clé API Serper manquante")
+        return None, None
+    
+    scheduler = get_scheduler()
+    remaining_credits = scheduler.remaining(daily_credits)
+    # Clé calculée avant build_variations, qui avance la position de reprise des institutions
+    key = search_key(query, region, num_results, fetch_dates_from_web, institutions, search_scope, keyword_filter, acquisition, institution_budget)
+    
+    with trace.span('planification', mode=acquisition) as details:
+        # Définir les variations de requête selon le nombre demandé et le scope
+        # (sans prévoir plus de requêtes sur les institutions que de crédits restants)
+        variations, covered = build_variations(
+            query, region, num_results, institutions, search_scope,
+            institution_budget=max(1, min(institution_budget, remaining_credits)),
+            acquisition=acquisition
+        )
+        # Crédits insuffisants : n'envoyer que les requêtes les plus utiles (les réponses en cache restent gratuites)
+        uncached = [i for i, full_query in enumerate(variations) if needs_credit(full_query, cache_ttl, force_refresh)]
+        details['requêtes'] = len(variations)
+    if len(uncached) > remaining_credits:
+        priorities = variation_priorities(variations)
+        dropped = set(sorted(uncached, key=lambda i: (priorities[i], i))[remaining_credits:])
+        variations = [full_query for i, full_query in enumerate(variations) if i not in dropped]
+        if not variations:
+            log.error(f"❌ Quota de {daily_credits} crédits Serper atteint pour aujourd'hui. Réessayez demain ou augmentez le quota.")
+            return None, None
+        log.warning(f"⚠️ Plus que {remaining_credits} crédit(s) Serper aujourd'hui : {len(dropped)} requête(s) non envoyée(s)")
+    
+    if debug and covered:
+        total = len(institution_domains(institutions))
+        message = f"🏫 {len(covered)}/{total} institution(s) couverte(s) par cette recherche"
+        if len(covered) < total:
+            message += " (les suivantes seront couvertes par les prochaines recherches)"
+        log.info(message)
+    
+    if debug:
+        log.info(f"🔍 {len(variations)} requête(s) pour obtenir ~{num_results} résultats")
+    
+    session = get_http_session()
+    cache = get_serper_cache()
+    # Signalé dès qu'une requête renvoie 401 : les requêtes pas encore parties sont abandonnées
+    invalid_key = threading.Event()
+    
+    def post_query(full_query, page=1):
+        """Retourne (code HTTP, données JSON, réponse issue du cache ?)"""
+        with trace.span('serper', requête=full_query, page=page) as details:
+            return send_query(full_query, page, details)
+    
+    def send_query(full_query, page, details):
+        payload = serper_payload(full_query, page)
+        key = make_key(payload)
+        if cache_ttl > 0 and not force_refresh:
+            data = cache.get(key, ttl=cache_ttl)
+            if data is not None:
+                trace.count('serper : cache')
+                details['origine'] = 'cache'
+                return 200, data, True
+        
+        if invalid_key.is_set():
+            return 401, None, False
+        response = scheduler.send(lambda: session.post(
+            SERPER_URL,
+            headers={
+                'X-API-KEY': api_key,
+                'Content-Type': 'application/json'
+            },
+            json=payload,
+            timeout=10
+        ))
+        trace.count('serper : requêtes')
+        details['origine'] = f'HTTP {response.status_code}'
+        if trace.enabled:
+            trace.count('serper : octets', len(response.content))
+        if response.status_code == 401:
+            invalid_key.set()
+        if response.status_code != 200:
+            return response.status_code, None, False
+        
+        data = response.json()
+        if cache_ttl > 0:
+            cache.set(key, data)
+        return 200, data, False
+    
+    cache_hits = 0
+    credits_spent = 0
+    executor = ThreadPoolExecutor(max_workers=min(SERPER_MAX_WORKERS, len(variations)))
+    try:
+        # Toutes les requêtes partent en parallèle et chaque réponse est affichée dès son arrivée...
+        futures = {executor.submit(post_query, full_query): i for i, full_query in enumerate(variations)}
+        responses = [None] * len(variations)
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            if debug:
+                log.info(f"📡 Requête {i+1}/{len(variations)}: `{variations[i]}`")
+            
+            status_code, data, from_cache = future.result()
+            cache_hits += from_cache
+            credits_spent += status_code == 200 and not from_cache
+            log.progress(done, len(variations), "Requêtes Serper")
+            
+            if status_code == 401:
+                log.error("❌ Clé API invalide. Vérifiez votre clé Serper.")
+                return None, None
+            elif status_code != 200:
+                log.error(f"❌ Erreur API: {status_code}")
+                continue
+            
+            responses[i] = data
+            log.partial(preview_rows(merge_responses(responses, variations), min_date, keyword_filter=keyword_filter))
+        
+        # ...mais le résultat final fusionne les réponses dans l'ordre des variations (dédoublonnage déterministe)
+        all_raw_results = merge_responses(responses, variations)
+        sent = len(variations)
+        queries = list(variations)  # Requête de chaque réponse (les pages suivantes répètent la requête de base)
+        
+        # Mode "pages" : pages suivantes de la requête de base, une à une, tant qu'elles apportent
+        # assez de nouveaux liens (chaque page coûte un crédit)
+        base = next((i for i, full_query in enumerate(variations) if 'site:' not in full_query), None)
+        max_pages = pages_needed(search_scope, num_results, acquisition)
+        new_results = len(merge_responses([responses[base]])) if base is not None and responses[base] else 0
+        page = 1
+        while base is not None and page < max_pages and len(all_raw_results) < num_results:
+            if new_results < PAGINATION_MIN_NEW_RESULTS:
+                if debug:
+                    log.info(f"⏹️ Pagination arrêtée après la page {page} : {new_results} nouveau(x) lien(s)")
+                break
+            page += 1
+            if needs_credit(variations[base], cache_ttl, force_refresh, page) and scheduler.remaining(daily_credits) < 1:
+                log.warning(f"⚠️ Quota de crédits Serper atteint : pagination arrêtée après la page {page - 1}")
+                break
+            if debug:
+                log.info(f"📡 Page {page}/{max_pages}: `{variations[base]}`")
+            
+            status_code, data, from_cache = post_query(variations[base], page)
+            sent += 1
+            cache_hits += from_cache
+            credits_spent += status_code == 200 and not from_cache
+            log.progress(page, max_pages, "Pages Serper")
+            if status_code == 401:
+                log.error("❌ Clé API invalide. Vérifiez votre clé Serper.")
+                return None, None
+            elif status_code != 200:
+                log.error(f"❌ Erreur API: {status_code}")
+                break
+            
+            responses.append(data)
+            queries.append(variations[base])
+            previous_count = len(all_raw_results)
+            all_raw_results = merge_responses(responses, queries)
+            new_results = len(all_raw_results) - previous_count
+            log.partial(preview_rows(all_raw_results, min_date, keyword_filter=keyword_filter))
+        
+        if debug:
+            log.info(f"💾 Cache Serper : {cache_hits} hit(s), {sent - cache_hits} miss(es) · "
+                     f"{scheduler.used_today()}/{daily_credits} crédit(s) utilisé(s) aujourd'hui")
+            log.info(f"📊 Total: {len(all_raw_results)} résultats uniques obtenus")
+            if credits_spent:
+                log.info(f"💳 {credits_spent} crédit(s) dépensé(s) pour {len(all_raw_results)} résultat(s) unique(s) : "
+                         f"{credits_spent / max(1, len(all_raw_results)):.2f} crédit par résultat (mode {acquisition})")
+        
+        trace.count('résultats bruts', len(all_raw_results))
+        if len(all_raw_results) == 0:
+            # Mêmes types (ResultView) qu'avec des résultats, pour que l'appelant n'ait pas de cas particulier
+            columns = result_columns(bool(institutions), incremental)
+            empty = ResultTable.from_records([], columns + DEBUG_COLUMNS)
+            return empty.view(columns=columns), empty.view() if debug else None
+        
+        store = get_result_store()
+        with trace.span('base locale (lecture)', résultats=len(all_raw_results)):
+            known_dates = store.known([record.link for record in all_raw_results], pages_checked=fetch_dates_from_web)
+        if debug and incremental:
+            log.info(f"🆕 {len(all_raw_results) - len(known_dates)} nouveau(x) résultat(s), "
+                     f"{len(known_dates)} déjà connu(s), dont "
+                     f"{sum(1 for date in known_dates.values() if date and date != 'Date à confirmer')} daté(s) (dates reprises de la base locale)")
+        
+        # Les dates trouvées sur les pages complètent les résultats provisoires au fil de l'eau
+        page_dates = {}
+        
+        def on_page(done, total, url, date):
+            log.progress(done, total, "Pages web consultées")
+            if date:
+                page_dates[url] = date
+                log.partial(preview_rows(all_raw_results, min_date, page_dates, keyword_filter))
+        
+        # Date et verdicts de filtrage calculés une seule fois par résultat
+        # (en mode debug, les pages des résultats exclus sont aussi consultées pour la vue brute)
+        enriched, fetch_timings = enrich_results(
+            all_raw_results, fetch_dates_from_web, min_date, fetch_excluded=debug,
+            session=session, page_cache=get_page_cache(), revalidate=force_refresh,
+            known_dates=known_dates if incremental else None, on_page=on_page,
+            keyword_filter=keyword_filter, trace=trace
+        )
+        for record in enriched:
+            record.new = record.link not in known_dates
+        
+        # Institution d'où vient chaque résultat (recherche dans l'index des domaines)
+        registry = institutions if isinstance(institutions, InstitutionRegistry) else InstitutionRegistry.from_urls(institutions or [])
+        if len(registry):
+            with trace.span('institutions', résultats=len(enriched), institutions=len(registry)):
+                for record in enriched:
+                    record.institution = registry.match(record.link)
+            attributed = sum(1 for record in enriched if record.institution)
+            trace.count('résultats rattachés à une institution', attributed)
+            if debug:
+                log.info(f"🏫 {attributed}/{len(enriched)} résultat(s) rattaché(s) à une institution")
+        with trace.span('base locale (écriture)', résultats=len(enriched)):
+            store.save(enriched, region, query, pages_checked=fetch_dates_from_web)
+        
+        if debug and fetch_timings:
+            found = sum(1 for timing in fetch_timings if timing['Durée (s)'] is not None and timing['Résultat'] != 'Aucune date')
+            from_cache = sum(1 for timing in fetch_timings if (timing['Origine'] or '').startswith('cache'))
+            # Précision : part des dates lues dans les données structurées de la page plutôt que dans le texte
+            structured = sum(1 for timing in fetch_timings if timing['Source'] in CONFIDENT_SOURCES)
+            downloaded = [timing['Octets lus'] for timing in fetch_timings if timing['Origine'] == 'réseau']
+            message = (f"⏱️ Dates cherchées sur {len(fetch_timings)} page(s) web : {found} trouvée(s) "
+                       f"dont {structured} dans les données structurées, {from_cache} depuis le cache")
+            if downloaded:
+                message += f" · {sum(downloaded) / len(downloaded) / 1024:.1f} Ko lus par page téléchargée"
+            log.table(message, fetch_timings)
+        
+        # Une seule table de résultats : la vue filtrée (et la vue brute du mode debug) n'en garde que les indices
+        kept = [i for i, record in enumerate(enriched) if not record.excluded and record.future]
+        with trace.span('doublons', résultats=len(kept)):
+            shown = [kept[position] for position in collapse_duplicates([enriched[i] for i in kept])]
+        columns = result_columns(len(registry) > 0, incremental)
+        if debug:
+            table = ResultTable.from_records(enriched, columns + DEBUG_COLUMNS)
+            raw_results = table.view()
+            filtered_results = table.view(shown, columns)
+        else:
+            # Hors debug, les résultats écartés ne sont pas gardés
+            raw_results = None
+            filtered_results = ResultTable.from_records([enriched[i] for i in shown], columns).view()
+        past_events_count = sum(1 for record in enriched if not record.excluded and not record.future)
+        trace.count('rejetés (mots-clés)', sum(1 for record in enriched if record.excluded))
+        trace.count('événements passés', past_events_count)
+        trace.count('doublons regroupés', len(kept) - len(shown))
+        trace.count('résultats affichés', len(filtered_results))
+        save_results(key, filtered_results, min_date)
+        
+        if debug and past_events_count > 0:
+            log.info(f"🗓️ {past_events_count} événement(s) passé(s) exclu(s)")
+        if debug and len(shown) < len(kept):
+            log.info(f"🔗 {len(kept) - len(shown)} doublon(s) regroupé(s) (liens dans la colonne 'Autres liens')")
+        
+        return filtered_results, raw_results
+    
+    except Exception as e:
+        log.error(f"❌ Erreur: {str(e)}")
+        return None, None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,214 @@
+import csv
+import hashlib
+import os
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from cache import CACHE_DIR
+
+# Fichiers d'export, générés au premier téléchargement puis réutilisés pour la même recherche (search_id)
+EXPORT_DIR = os.path.join(CACHE_DIR, 'exports')
+EXPORT_RETENTION_HOURS = 24
+
+# Lignes écrites ensemble dans un fichier Parquet (la mémoire utilisée ne dépend pas du nombre de lignes)
+PARQUET_BATCH_ROWS = 5000
+
+# Date d'un résultat : "15/01/2025" ou plage "15-17/01/2025" (les dates sans jour ne vont pas dans le calendrier)
+_EVENT_DATE = re.compile(r'^(\d{1,2})(?:-(\d{1,2}))?/(\d{1,2})/(\d{2}|\d{4})$')
+
+ICS_PRODID = '-//Voix du Nucleaire//Recherche evenements//FR'
+
+
+def event_days(date_str):
+    """(premier jour, lendemain du dernier jour) d'une date de résultat, ou None si elle n'a pas de jour précis"""
+    match = _EVENT_DATE.match(date_str or '')
+    if not match:
+        return None
+    day, day_end, month, year = match.groups()
+    year = int(year) + 2000 if len(year) == 2 else int(year)
+    try:
+        start = date(year, int(month), int(day))
+        end = date(year, int(month), int(day_end)) if day_end else start
+    except ValueError:
+        return None
+    return start, max(start, end) + timedelta(days=1)
+
+
+class CsvExport:
+    """CSV (ou TSV avec delimiter='\\t'), écrit ligne par ligne"""
+
+    def __init__(self, stream, fields, delimiter=','):
+        self.writer = csv.DictWriter(stream, fieldnames=fields, delimiter=delimiter, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        pass
+
+
+def _ics_text(value):
+    """Texte d'une propriété iCalendar (RFC 5545 : \\, ; , et retours à la ligne échappés)"""
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r', '').replace('\n', '\\n')
+
+
+def _ics_line(line):
+    """Ligne iCalendar repliée tous les 75 octets (sans couper un caractère UTF-8)"""
+    data = line.encode('utf-8')
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:  # Octet de continuation : recule au début du caractère
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+        limit = 74  # Les lignes suivantes commencent par une espace
+    parts.append(data)
+    return b'\r\n '.join(parts).decode('utf-8') + '\r\n'
+
+
+class IcsExport:
+    """Calendrier iCalendar : un événement sur la journée (ou la plage de jours) par résultat daté"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        self.events = 0
+        for line in ('BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{ICS_PRODID}', 'CALSCALE:GREGORIAN'):
+            self.stream.write(_ics_line(line))
+
+    def write(self, row):
+        days = event_days(row.get('Date'))
+        if days is None:
+            return  # "Date à confirmer" : pas de place dans un calendrier
+        link = row.get('Lien', '')
+        lines = [
+            'BEGIN:VEVENT',
+            # Même UID d'un export à l'autre : un agenda abonné met l'événement à jour au lieu de le dupliquer
+            f"UID:{hashlib.sha1(link.encode('utf-8')).hexdigest()}@recherche-evenements-vdn",
+            f'DTSTAMP:{self.stamp}',
+            f"DTSTART;VALUE=DATE:{days[0].strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{days[1].strftime('%Y%m%d')}",
+            f"SUMMARY:{_ics_text(row.get('Événement'))}",
+            f"DESCRIPTION:{_ics_text(row.get('Description'))}",
+        ]
+        if link:
+            lines.append(f'URL:{link}')
+        lines.append('END:VEVENT')
+        for line in lines:
+            self.stream.write(_ics_line(line))
+        self.events += 1
+
+    def close(self):
+        self.stream.write(_ics_line('END:VCALENDAR'))
+
+
+class ParquetExport:
+    """Fichier Parquet (colonnes texte), écrit par lots de PARQUET_BATCH_ROWS lignes
+
+    pyarrow (dans requirements.txt) n'est importé qu'au premier export Parquet.
+    """
+
+    def __init__(self, path, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.fields = fields
+        self.schema = pa.schema([(field, pa.string()) for field in fields])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.pending = []
+
+    def write(self, row):
+        self.pending.append({field: None if row.get(field) is None else str(row.get(field)) for field in self.fields})
+        if len(self.pending) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.writer.write_batch(self._pa.RecordBatch.from_pylist(self.pending, schema=self.schema))
+            self.pending = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+# Formats proposés au téléchargement : extension du fichier, type MIME, libellé du bouton
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv', "📥 Télécharger CSV"),
+    'tsv': ('txt', 'text/plain', "📋 Télécharger pour Excel"),
+    'ics': ('ics', 'text/calendar', "📅 Calendrier (ICS)"),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', "🗃️ Parquet"),
+}
+
+
+def open_export(fmt, path, fields):
+    """Ouvre le fichier path et retourne un export du format demandé (write(ligne) puis close())"""
+    if fmt == 'parquet':
+        return ParquetExport(path, fields)
+    if fmt == 'ics':
+        return _Closing(IcsExport, open(path, 'w', encoding='utf-8', newline=''))
+    if fmt == 'tsv':
+        return _Closing(CsvExport, open(path, 'w', encoding='utf-8', newline=''), fields, delimiter='\t')
+    # utf-8-sig : le CSV s'ouvre directement avec les accents dans Excel
+    return _Closing(CsvExport, open(path, 'w', encoding='utf-8-sig', newline=''), fields)
+
+
+class _Closing:
+    """Export écrit dans un fichier texte ouvert par open_export, refermé avec lui"""
+
+    def __init__(self, export_class, stream, *args, **kwargs):
+        self.stream = stream
+        self.export = export_class(stream, *args, **kwargs)
+
+    def write(self, row):
+        self.export.write(row)
+
+    def close(self):
+        self.export.close()
+        self.stream.close()
+
+
+def prune_exports(directory=None, retention=EXPORT_RETENTION_HOURS * 3600):
+    """Supprime les exports plus anciens que retention secondes"""
+    directory = directory or EXPORT_DIR
+    now = time.time()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > retention:
+                os.remove(path)
+        except OSError:
+            pass  # Déjà supprimé par un autre processus
+
+
+def export_file(rows, search_id, fmt, directory=None):
+    """Chemin de l'export des résultats d'une recherche, écrit ligne par ligne s'il n'existe pas encore"""
+    directory = directory or EXPORT_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{search_id}.{fmt}')
+    if os.path.exists(path):
+        return path
+
+    prune_exports(directory)
+    fields = list(rows[0]) if rows else []
+    # Écrit sous un nom temporaire : un export interrompu n'est jamais servi
+    partial_path = f'{path}.{os.getpid()}.tmp'
+    export = open_export(fmt, partial_path, fields)
+    try:
+        for row in rows:
+            export.write(row)
+    finally:
+        export.close()
+    os.replace(partial_path, path)
+    return path
+
+
+def export_bytes(rows, search_id, fmt):
+    """Contenu de l'export (pour un bouton de téléchargement)"""
+    with open(export_file(rows, search_id, fmt), 'rb') as f:
+        return f.read()
@@ -0,0 +1,99 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Mots-clés à filtrer côté client
+EXCLUDE_KEYWORDS = ['tourisme', 'hôtellerie', 'restauration', 'cuisine', 'gastronomie',
+                    'hôtelier', 'culinaire', 'arts culinaires', 'service en salle']
+
+
+# Ligatures et apostrophe typographique, que la décomposition Unicode ne ramène pas à l'ASCII
+_LIGATURES = (('œ', 'oe'), ('æ', 'ae'), ('’', "'"))
+
+
+def fold_accents(text):
+    """Texte en minuscules et sans accents ("Journée" -> "journee")
+
+    Les caractères qui n'ont pas d'équivalent ASCII (€, «, emojis...) sont retirés.
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+    for ligature, replacement in _LIGATURES:
+        text = text.replace(ligature, replacement)
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def _trie_pattern(words):
+    """Regex équivalente à "mot1|mot2|..." mais structurée en arbre de préfixes
+
+    À chaque position du texte, seuls les mots qui commencent par le caractère lu sont
+    essayés : le coût ne dépend pas du nombre de mots-clés.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        # Un mot qui se termine ici rend la suite facultative (le plus long mot-clé est préféré)
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if '' in node else body
+
+    return render(trie)
+
+
+class KeywordFilter:
+    """Filtre par mots-clés, insensible à la casse et aux accents
+
+    exclude : un résultat qui contient l'un de ces mots-clés est rejeté.
+    include : si la liste n'est pas vide, un résultat doit contenir au moins l'un de ces mots-clés.
+    Chaque liste est compilée une fois en une seule regex ; le titre et l'extrait ne sont
+    normalisés qu'une fois par résultat.
+    """
+
+    def __init__(self, exclude=EXCLUDE_KEYWORDS, include=()):
+        # Un mot-clé vide une fois normalisé (émoji, "€"...) rendrait la regex vraie partout : il est ignoré
+        self.exclude = [keyword.strip() for keyword in exclude if fold_accents(keyword.strip())]
+        self.include = [keyword.strip() for keyword in include if fold_accents(keyword.strip())]
+        # Mot-clé normalisé -> mot-clé tel que saisi (pour indiquer la règle appliquée)
+        self._exclude_rules = {fold_accents(keyword): keyword for keyword in self.exclude}
+        self._exclude = re.compile(_trie_pattern(self._exclude_rules)) if self.exclude else None
+        self._include = re.compile(_trie_pattern(map(fold_accents, self.include))) if self.include else None
+
+    def rejection(self, title, snippet):
+        """Règle qui rejette le résultat ("exclu : hôtellerie"...), ou None s'il est gardé"""
+        text = fold_accents(title + '\n' + snippet)
+        if self._exclude:
+            match = self._exclude.search(text)
+            if match:
+                return f"exclu : {self._exclude_rules[match.group(0)]}"
+        if self._include and not self._include.search(text):
+            return "aucun mot-clé requis"
+        return None
+
+    def is_excluded(self, title, snippet):
+        return self.rejection(title, snippet) is not None
+
+
+@lru_cache(maxsize=32)
+def compile_filter(exclude=tuple(EXCLUDE_KEYWORDS), include=()):
+    """Filtre compilé pour ces listes de mots-clés (tuples), réutilisé tant que les listes ne changent pas"""
+    return KeywordFilter(exclude, include)
+
+
+def parse_keywords(text):
+    """Liste de mots-clés saisie par l'utilisateur (séparés par des virgules ou des retours à la ligne)"""
+    return tuple(keyword.strip() for keyword in re.split(r'[,\n]', text or '') if keyword.strip())
+
+
+def is_excluded(title, snippet):
+    """Vrai si le résultat concerne un domaine non pertinent (tourisme, hôtellerie...)"""
+    return compile_filter().is_excluded(title, snippet)
@@ -0,0 +1,354 @@
+import codecs
+import csv
+import hashlib
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from filters import fold_accents
+from urls import canonical_url
+
+# Limites d'une requête Google (via Serper) : au-delà de 32 mots, les termes suivants sont ignorés
+QUERY_MAX_WORDS = 32
+QUERY_MAX_CHARS = 2048
+
+# Listes d'institutions gardées en mémoire, partagées par toutes les sessions du processus
+SHEET_CACHE_TTL_MINUTES = 10
+SHEET_TIMEOUT = 10
+# L'export CSV est lu par blocs : la mémoire utilisée ne dépend pas de la taille de la Sheet
+SHEET_CHUNK_SIZE = 64 * 1024
+# Export recopié pour comparer son empreinte : gardé en mémoire jusqu'à cette taille, sur disque au-delà
+SHEET_SPOOL_SIZE = 1024 * 1024
+# Lignes rejetées gardées pour l'affichage (les suivantes sont seulement comptées)
+MAX_REJECTS_KEPT = 100
+
+# Colonnes facultatives de la Sheet après l'URL (colonne A), reconnues par leur en-tête ;
+# sans en-tête, les colonnes B, C et D sont lues dans cet ordre
+# (premier mot du titre, sans accents ni majuscules : "Nom de l'établissement", "Région"...)
+EXTRA_COLUMNS = {
+    'name': ('nom', 'name', 'etablissement', 'institution'),
+    'region': ('region',),
+    'type': ('type',),
+}
+
+Institution = namedtuple('Institution', 'url domain name region type')
+
+
+def sheet_id_from_url(sheet_url):
+    """ID d'une Google Sheet à partir de son lien complet (None si le lien n'en contient pas)"""
+    if '/d/' not in sheet_url:
+        return None
+    return sheet_url.split('/d/')[1].split('/')[0]
+
+
+def iter_lines(chunks, digest=None):
+    """Découpe un flux d'octets UTF-8 en lignes de texte (fins de ligne conservées pour le module csv)
+    
+    digest (hashlib) reçoit au passage les octets lus, pour détecter un contenu inchangé.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    for chunk in chunks:
+        if digest is not None:
+            digest.update(chunk)
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def extra_columns(header):
+    """Position des colonnes facultatives ({'name': 1, ...}) d'après la ligne d'en-tête"""
+    columns = {}
+    for position, title in enumerate(header[1:], start=1):
+        words = fold_accents(title).split()
+        for field, titles in EXTRA_COLUMNS.items():
+            if words and words[0] in titles:
+                columns.setdefault(field, position)
+    return columns
+
+
+def parse_institutions(lines):
+    """Institutions (URL en première colonne, puis nom, région et type facultatifs) d'un export CSV, lu ligne à ligne
+    
+    Les URLs sont dédoublonnées (même URL canonique) dans l'ordre de la Sheet.
+    Retourne (institutions, rejets, nombre de rejets) ; chaque institution est un Institution,
+    chaque rejet est (ligne, valeur, raison).
+    Les lignes vides et un éventuel en-tête en première ligne sont ignorés sans être rejetés.
+    """
+    institutions = []
+    seen = {}
+    rejects = []
+    reject_count = 0
+    columns = {'name': 1, 'region': 2, 'type': 3}
+    reader = csv.reader(lines)
+    for row in reader:
+        value = row[0].strip() if row else ''
+        line = reader.line_num
+        if not value:
+            continue
+        
+        reason = None
+        if not value.lower().startswith(('http://', 'https://')):
+            if line == 1:
+                columns = extra_columns(row)  # En-tête de colonne
+                continue
+            reason = "pas une URL http(s)"
+        elif not urlsplit(value).hostname:
+            reason = "URL sans domaine"
+        else:
+            key = canonical_url(value)
+            if key in seen:
+                reason = f"doublon de la ligne {seen[key]}"
+            else:
+                seen[key] = line
+                details = {field: (row[position].strip() if position < len(row) else '') for field, position in columns.items()}
+                institutions.append(Institution(
+                    value, institution_domain(value), details.get('name', ''), details.get('region', ''), details.get('type', '')
+                ))
+        
+        if reason:
+            reject_count += 1
+            if len(rejects) < MAX_REJECTS_KEPT:
+                rejects.append((line, value, reason))
+    return institutions, rejects, reject_count
+
+
+class InstitutionRegistry:
+    """Institutions indexées par domaine, pour retrouver en temps constant celle d'où vient un résultat
+    
+    Un résultat est rattaché à l'institution dont le domaine est le sien ou l'un de ses suffixes
+    (iut.univ-lyon1.fr -> univ-lyon1.fr) : le nombre de recherches dans l'index dépend du nombre
+    de sous-domaines du lien, pas du nombre d'institutions.
+    Le registre se parcourt comme la liste des URLs des institutions.
+    """
+
+    def __init__(self, institutions=()):
+        self.institutions = list(institutions)
+        self._by_domain = {}
+        for institution in self.institutions:
+            if institution.domain:
+                self._by_domain.setdefault(institution.domain, []).append(institution)
+        self.domains = list(self._by_domain)
+
+    @classmethod
+    def from_urls(cls, urls):
+        """Registre d'une simple liste d'URLs (sans nom, région ni type)"""
+        return cls().extended(urls)
+
+    def extended(self, urls):
+        """Nouveau registre avec en plus les URLs données (celles déjà présentes sont ignorées)"""
+        seen = {canonical_url(institution.url) for institution in self.institutions}
+        added = []
+        for url in urls:
+            key = canonical_url(url)
+            if key not in seen:
+                seen.add(key)
+                added.append(Institution(url, institution_domain(url), '', '', ''))
+        return InstitutionRegistry(self.institutions + added) if added else self
+
+    def match(self, url):
+        """Institution d'où vient un lien, ou None
+        
+        Si plusieurs institutions partagent le domaine (univ.fr/iut, univ.fr/ecole...), celle dont
+        le chemin correspond au lien est préférée.
+        """
+        parts = urlsplit(url)
+        labels = (parts.hostname or '').split('.')
+        # Du domaine complet au domaine et son extension (jamais l'extension seule)
+        for start in range(len(labels) - 1):
+            candidates = self._by_domain.get('.'.join(labels[start:]))
+            if candidates:
+                if len(candidates) == 1:
+                    return candidates[0]
+                path = parts.path.rstrip('/') + '/'
+                return next((institution for institution in candidates
+                             if path.startswith(urlsplit(institution.url).path.rstrip('/') + '/')), candidates[0])
+        return None
+
+    def __iter__(self):
+        return (institution.url for institution in self.institutions)
+
+    def __len__(self):
+        return len(self.institutions)
+
+
+class SheetCache:
+    """Dernière version chargée de chaque Google Sheet, par ID
+    
+    Pendant ttl secondes la liste en mémoire est servie sans appel réseau ; ensuite l'export
+    est redemandé avec ses validateurs (ETag, Last-Modified) et la liste n'est remplacée
+    que si son contenu (empreinte sha256) a changé.
+    """
+
+    def __init__(self, ttl=SHEET_CACHE_TTL_MINUTES * 60, timeout=SHEET_TIMEOUT):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self, sheet_url, force=False):
+        """Retourne (URLs des institutions, erreur, statut)
+        
+        statut = {'origine', 'registre', 'durée', 'rejets', 'nb_rejets'} : d'où vient la liste, les
+        institutions indexées par domaine avec leurs colonnes (InstitutionRegistry, construit une fois
+        par téléchargement), en combien de temps, et les lignes ignorées de la Sheet.
+        force ignore la version en mémoire : l'export est téléchargé et analysé à nouveau.
+        """
+        started = time.perf_counter()
+        sheet_id = sheet_id_from_url(sheet_url)
+        if not sheet_id:
+            return None, "❌ URL invalide. Utilisez le lien complet de votre Google Sheet.", None
+        
+        with self._lock:
+            if force:
+                self._entries.pop(sheet_id, None)
+            entry = self._entries.get(sheet_id)
+        
+        def done(origin):
+            return list(entry['registry']), None, {
+                'origine': origin,
+                'registre': entry['registry'],
+                'durée': time.perf_counter() - started,
+                'rejets': entry['rejects'],
+                'nb_rejets': entry['reject_count']
+            }
+        
+        if entry and time.time() - entry['checked'] < self.ttl:
+            return done('mémoire')
+        
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        try:
+            import requests  # Seulement au chargement d'une Sheet
+            
+            csv_url = f'https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv'
+            with requests.get(csv_url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if entry and response.status_code == 304:
+                    entry['checked'] = time.time()
+                    return done('inchangée (304)')
+                response.raise_for_status()
+                
+                digest = hashlib.sha256()
+                # Toujours décoder en UTF-8 : l'export n'indique pas toujours son encodage
+                if entry:
+                    # Liste déjà chargée : l'empreinte est comparée avant toute analyse. Le contenu est
+                    # recopié dans un fichier temporaire (sur disque au-delà de SHEET_SPOOL_SIZE), relu
+                    # seulement s'il a changé
+                    with tempfile.SpooledTemporaryFile(max_size=SHEET_SPOOL_SIZE) as spool:
+                        for chunk in response.iter_content(SHEET_CHUNK_SIZE):
+                            digest.update(chunk)
+                            spool.write(chunk)
+                        changed = entry['digest'] != digest.hexdigest()
+                        if changed:
+                            spool.seek(0)
+                            chunks = iter(lambda: spool.read(SHEET_CHUNK_SIZE), b'')
+                            institutions, rejects, reject_count = parse_institutions(iter_lines(chunks))
+                else:
+                    # Premier chargement : analyse au fil du téléchargement
+                    changed = True
+                    lines = iter_lines(response.iter_content(SHEET_CHUNK_SIZE), digest)
+                    institutions, rejects, reject_count = parse_institutions(lines)
+            
+            if not changed:
+                origin = 'inchangée (contenu identique)'
+            else:
+                entry = {
+                    'registry': InstitutionRegistry(institutions),
+                    'rejects': rejects,
+                    'reject_count': reject_count,
+                    'digest': digest.hexdigest()
+                }
+                origin = 'téléchargée'
+            entry.update(
+                checked=time.time(),
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            with self._lock:
+                self._entries[sheet_id] = entry
+            return done(origin)
+        except Exception as e:
+            return None, f"❌ Erreur lors du chargement: {str(e)}", None
+
+    def invalidate(self, sheet_url=None):
+        """Oublie une Google Sheet (ou toutes)"""
+        with self._lock:
+            if sheet_url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(sheet_id_from_url(sheet_url), None)
+
+
+@lru_cache(maxsize=None)
+def get_sheet_cache():
+    return SheetCache()
+
+
+def load_from_google_sheet(sheet_url, force=False):
+    """Charge les institutions depuis une Google Sheet publique"""
+    institutions, error, _ = get_sheet_cache().load(sheet_url, force)
+    return institutions, error
+
+
+def institution_domain(url):
+    """Domaine d'une institution, sans 'www.' (site:ec-lyon.fr couvre aussi www.ec-lyon.fr)"""
+    host = (urlsplit(url.strip()).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def institution_domains(institutions):
+    """Domaines distincts d'une liste d'URLs d'institutions (ou d'un InstitutionRegistry), dans l'ordre de la liste"""
+    if isinstance(institutions, InstitutionRegistry):
+        return list(institutions.domains)
+    return list(dict.fromkeys(domain for domain in map(institution_domain, institutions) if domain))
+
+
+def site_query(query, domains, year):
+    """Requête limitée aux sites donnés : "forum (site:a.fr OR site:b.fr) 2025" """
+    if len(domains) == 1:
+        return f'{query} site:{domains[0]} {year}'
+    sites = ' OR '.join(f'site:{domain}' for domain in domains)
+    return f'{query} ({sites}) {year}'
+
+
+def fits_in_query(text):
+    return len(text.split()) <= QUERY_MAX_WORDS and len(text) <= QUERY_MAX_CHARS
+
+
+def plan_site_queries(query, domains, year, max_queries, offset=0):
+    """Regroupe les domaines dans des requêtes "site:a OR site:b ..." aussi remplies que possible
+    
+    Les domaines sont parcourus à partir de offset (en boucle) jusqu'à max_queries requêtes.
+    Retourne (requêtes, domaines couverts).
+    """
+    if not domains or max_queries < 1:
+        return [], []
+    
+    offset %= len(domains)
+    queries = []
+    covered = []
+    group = []
+    for domain in domains[offset:] + domains[:offset]:
+        if group and not fits_in_query(site_query(query, group + [domain], year)):
+            queries.append(site_query(query, group, year))
+            covered.extend(group)
+            group = []
+            if len(queries) == max_queries:
+                return queries, covered
+        group.append(domain)
+    
+    queries.append(site_query(query, group, year))
+    covered.extend(group)
+    return queries, covered
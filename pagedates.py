@@ -0,0 +1,178 @@
+import codecs
+import json
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from dates import extract_date
+
+# Octets lus au plus par page : au-delà, la lecture s'arrête et la meilleure date trouvée est gardée
+PAGE_MAX_BYTES = 256 * 1024
+PAGE_CHUNK_SIZE = 16 * 1024
+# Texte visible gardé pour les expressions régulières (dernier recours)
+PAGE_TEXT_MAX_CHARS = 20000
+
+# Types de contenu analysés (les PDF, images... ne sont pas téléchargés)
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Origine de la date, de la plus sûre à la moins sûre
+SOURCES = ('JSON-LD', 'microdonnées', 'balise meta', 'balise time', 'texte')
+# Sources assez sûres pour arrêter la lecture dès qu'elles sont trouvées (date de début d'un événement)
+CONFIDENT_SOURCES = ('JSON-LD', 'microdonnées', 'balise meta')
+
+# Balises meta des événements (Open Graph / Facebook et variantes courantes)
+EVENT_META_NAMES = {'event:start_time', 'og:event:start_time', 'og:start_time', 'event:start_date', 'startdate'}
+
+# Balises dont le contenu n'est pas du texte visible
+_HIDDEN_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+_ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+PageScan = namedtuple('PageScan', 'date source bytes_read')
+
+
+def iso_date(value):
+    """Date JJ/MM/AAAA d'une valeur ISO 8601 ("2025-03-15T09:00:00+01:00"), ou None"""
+    match = _ISO_DATE.search(value or '')
+    if not match:
+        return None
+    year, month, day = match.groups()
+    if not (1 <= int(month) <= 12 and 1 <= int(day) <= 31):
+        return None
+    return f"{int(day):02d}/{int(month):02d}/{year}"
+
+
+def _is_event_type(value):
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(name, str) and (name.endswith('Event') or name == 'Festival') for name in types)
+
+
+def json_ld_start_date(data):
+    """startDate du premier événement schema.org d'un bloc JSON-LD (objets imbriqués et @graph compris)"""
+    fallback = None
+    stack = [data]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            date = iso_date(node['startDate']) if isinstance(node.get('startDate'), str) else None
+            if date and _is_event_type(node.get('@type')):
+                return date
+            fallback = fallback or date
+            stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    return fallback
+
+
+class PageDateParser(HTMLParser):
+    """Analyse HTML incrémentale (feed() par morceaux) qui cherche la date d'un événement
+
+    Les données structurées (JSON-LD, microdonnées, balises meta) sont préférées à <time datetime>,
+    puis aux dates écrites dans le texte visible. done passe à vrai dès qu'une date sûre est trouvée.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.found = {}  # source -> première date trouvée
+        self._hidden = 0
+        self._json_ld = None
+        self._text = []
+        self._text_size = 0
+
+    @property
+    def done(self):
+        return any(source in self.found for source in CONFIDENT_SOURCES)
+
+    def _found(self, source, date):
+        if date:
+            self.found.setdefault(source, date)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and (attrs.get('type') or '').lower() == 'application/ld+json':
+            self._json_ld = []
+        if tag in _HIDDEN_TAGS:
+            self._hidden += 1
+        if (attrs.get('itemprop') or '').lower() == 'startdate':
+            self._found('microdonnées', iso_date(attrs.get('content') or attrs.get('datetime')))
+        if tag == 'meta':
+            name = (attrs.get('property') or attrs.get('name') or '').lower()
+            if name in EVENT_META_NAMES:
+                self._found('balise meta', iso_date(attrs.get('content')))
+        elif tag == 'time':
+            self._found('balise time', iso_date(attrs.get('datetime')))
+
+    def handle_startendtag(self, tag, attrs):
+        # <meta ... /> : pas de contenu, donc pas de balise fermante à attendre
+        self.handle_starttag(tag, attrs)
+        if tag == 'script':
+            self._json_ld = None
+        if tag in _HIDDEN_TAGS:
+            self._hidden -= 1
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._json_ld is not None:
+            try:
+                self._found('JSON-LD', json_ld_start_date(json.loads(''.join(self._json_ld))))
+            except ValueError:
+                pass  # Bloc JSON-LD invalide : ignoré
+            self._json_ld = None
+        if tag in _HIDDEN_TAGS and self._hidden:
+            self._hidden -= 1
+
+    def handle_data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+        elif not self._hidden and self._text_size < PAGE_TEXT_MAX_CHARS:
+            self._text.append(data)
+            self._text_size += len(data)
+
+    def result(self):
+        """(date, source) la plus sûre trouvée, ou (None, None)"""
+        for source in SOURCES[:-1]:
+            if source in self.found:
+                return self.found[source], source
+        date = extract_date(' '.join(self._text)[:PAGE_TEXT_MAX_CHARS], memo=False)
+        return (date, 'texte') if date else (None, None)
+
+
+def is_html(content_type):
+    """Vrai si la page peut contenir une date lisible (HTML, ou type non indiqué)"""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return not media_type or media_type in HTML_CONTENT_TYPES
+
+
+def _decoder(content_type):
+    """Décodeur incrémental du charset annoncé (UTF-8 par défaut ou si le charset est inconnu)"""
+    match = _CHARSET.search(content_type or '')
+    try:
+        return codecs.getincrementaldecoder(match.group(1) if match else 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def scan_page(response, max_bytes=PAGE_MAX_BYTES, chunk_size=PAGE_CHUNK_SIZE):
+    """Lit une réponse HTTP (requête faite avec stream=True) morceau par morceau et en extrait la date
+
+    La lecture s'arrête dès qu'une date sûre est trouvée, à max_bytes octets, ou tout de suite
+    si le contenu n'est pas du HTML. Retourne PageScan(date, source, octets lus).
+    """
+    content_type = response.headers.get('Content-Type', '')
+    if not is_html(content_type):
+        return PageScan(None, None, 0)
+
+    parser = PageDateParser()
+    decoder = _decoder(content_type)
+    bytes_read = 0
+    for chunk in response.iter_content(chunk_size):
+        chunk = chunk[:max_bytes - bytes_read]
+        bytes_read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done or bytes_read >= max_bytes:
+            break
+    else:
+        parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    date, source = parser.result()
+    return PageScan(date, source, bytes_read)
@@ -0,0 +1,135 @@
+"""Pré-calcul des recherches enregistrées, pour que l'application y réponde sans attendre
+
+Lance les recherches de la grille (types d'événements × régions) avec le même moteur que
+l'application et garde leurs résultats dans le cache local partagé (voir engine.saved_results).
+Une recherche de l'onglet "Recherche" qui correspond à une recherche pré-calculée est alors
+affichée immédiatement, avec l'heure du calcul.
+
+Seules les recherches dont les résultats ont plus de --refresh-after heures sont relancées,
+les plus anciennes d'abord, sans dépasser --budget crédits Serper par passage.
+
+    python prewarm.py --budget 20                      # un passage (à lancer par cron)
+    python prewarm.py --budget 20 --every 60           # un passage toutes les 60 minutes
+    python prewarm.py -q "forum des métiers" -r Bretagne Normandie --budget 10
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import uuid
+
+from engine import (
+    ACQUISITION_MODES, EVENT_TYPES, REGIONS, SEARCH_RESULTS_MAX_AGE_HOURS, SERPER_DAILY_CREDITS,
+    PrintLog, estimate_cost, get_scheduler, saved_results, search_events, search_key
+)
+from filters import EXCLUDE_KEYWORDS, compile_filter
+from institutions import get_sheet_cache
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcul des recherches enregistrées (types d'événements × régions)")
+    parser.add_argument('-q', '--queries', nargs='+', default=EVENT_TYPES, help="Requêtes à pré-calculer (par défaut : les types d'événements de la recherche rapide)")
+    parser.add_argument('-r', '--regions', nargs='+', default=REGIONS, help="Régions (par défaut : toutes, y compris \"Toute la France\")")
+    parser.add_argument('-n', '--num-results', type=int, default=20, choices=[10, 20, 50], help="Nombre de résultats visé (comme dans l'application)")
+    parser.add_argument('--acquisition', choices=ACQUISITION_MODES, default='variations', help="Au-delà de 10 résultats : variations de la requête, ou pages suivantes")
+    parser.add_argument('--fetch-dates', action='store_true', help="Chercher les dates sur les pages web")
+    parser.add_argument('--sheet', help="Google Sheet des institutions chargée dans l'application (les recherches web les mettent en priorité)")
+    parser.add_argument('--exclude', nargs='*', default=EXCLUDE_KEYWORDS, help="Mots-clés qui écartent un résultat (comme dans l'application)")
+    parser.add_argument('--include', nargs='*', default=[], help="Mots-clés dont un résultat doit contenir au moins un")
+    parser.add_argument('--budget', type=int, required=True, help="Crédits Serper au plus par passage")
+    parser.add_argument('--daily-credits', type=int, default=SERPER_DAILY_CREDITS, help="Quota de crédits Serper par jour (partagé avec l'application)")
+    parser.add_argument('--refresh-after', type=float, default=SEARCH_RESULTS_MAX_AGE_HOURS / 2, help="Relancer les recherches dont les résultats ont plus de ces heures")
+    parser.add_argument('--every', type=float, help="Relancer un passage toutes les N minutes (sinon un seul passage)")
+    parser.add_argument('--api-key', default=os.environ.get('SERPER_API_KEY'), help="Clé API Serper (par défaut : variable SERPER_API_KEY)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Afficher le détail de chaque recherche (mode debug)")
+    args = parser.parse_args(argv)
+
+    unknown = [region for region in args.regions if region not in REGIONS]
+    if unknown:
+        parser.error(f"région(s) inconnue(s) : {', '.join(unknown)}")
+    if not args.api_key:
+        parser.error("clé API Serper manquante (--api-key ou variable SERPER_API_KEY)")
+    return args
+
+
+def due_searches(args, institutions, keyword_filter):
+    """Recherches à relancer, les plus anciennes (ou jamais calculées) d'abord : [(âge en secondes, requête, région)]"""
+    now = time.time()
+    due = []
+    for query, region in itertools.product(args.queries, args.regions):
+        key = search_key(query, region, args.num_results, args.fetch_dates, institutions, "web", keyword_filter, args.acquisition)
+        _, created = saved_results(key, max_age=float('inf'))
+        age = now - created if created else float('inf')
+        if age > args.refresh_after * 3600:
+            due.append((age, query, region))
+    return sorted(due, key=lambda search: -search[0])
+
+
+def warm(args, institutions):
+    """Un passage : relance les recherches dues dans la limite du budget. Retourne le nombre d'erreurs"""
+    keyword_filter = compile_filter(tuple(args.exclude), tuple(args.include))
+    scheduler = get_scheduler()
+    # Réponses Serper plus récentes que l'intervalle de rafraîchissement réutilisées sans crédit
+    cache_ttl = args.refresh_after * 3600
+    due = due_searches(args, institutions, keyword_filter)
+    print(f"🔥 {len(due)} recherche(s) à rafraîchir, budget de {args.budget} crédit(s)", file=sys.stderr)
+
+    budget = args.budget
+    failures = 0
+    for _, query, region in due:
+        _, credits = estimate_cost(query, region, args.num_results, institutions, "web", cache_ttl=cache_ttl, acquisition=args.acquisition)
+        if credits > min(budget, scheduler.remaining(args.daily_credits)):
+            print(f"⏭️ {query} · {region} : {credits} crédit(s) nécessaire(s), {budget} restant(s) pour ce passage", file=sys.stderr)
+            continue
+        used_before = scheduler.used_today()
+        search_id = str(uuid.uuid4())[:8]
+        results, _ = search_events(
+            query,
+            region,
+            args.api_key,
+            args.num_results,
+            args.fetch_dates,
+            institutions,
+            "web",
+            debug=args.verbose,
+            cache_ttl=cache_ttl,
+            log=PrintLog(prefix=f"[{search_id}] "),
+            # Le budget du passage borne aussi les crédits que la recherche peut consommer
+            daily_credits=min(args.daily_credits, used_before + budget),
+            incremental=True,
+            keyword_filter=keyword_filter,
+            acquisition=args.acquisition
+        )
+        budget -= scheduler.used_today() - used_before
+        failures += results is None
+        status = "erreur" if results is None else f"{len(results)} événement(s)"
+        print(f"✅ {query} · {region} : {status} ({budget} crédit(s) restant(s) pour ce passage)", file=sys.stderr)
+    return failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    institutions = []
+    if args.sheet:
+        _, error, status = get_sheet_cache().load(args.sheet)
+        if error:
+            print(error, file=sys.stderr)
+            return 1
+        institutions = status['registre']
+        print(f"✅ {len(institutions)} institution(s) chargée(s)", file=sys.stderr)
+
+    failures = warm(args, institutions)
+    while args.every:
+        time.sleep(args.every * 60)
+        if args.sheet:
+            # Liste rechargée si la Sheet a changé ; en cas d'erreur, la précédente est gardée
+            _, error, status = get_sheet_cache().load(args.sheet)
+            institutions = institutions if error else status['registre']
+        failures = warm(args, institutions)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
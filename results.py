@@ -0,0 +1,134 @@
+from collections.abc import Sequence
+
+# Colonnes du tableau de résultats affichées à tous
+RESULT_COLUMNS = ('Date', 'Événement', 'Description', 'Lien', 'Autres liens')
+# Colonnes ajoutées à la vue brute du mode debug
+DEBUG_COLUMNS = ('Requête Serper', 'Rejeté par')
+
+
+class EventRecord:
+    """Résultat Serper enrichi au fil de la recherche (date, verdict du filtre, institution...)
+
+    __slots__ : pas de dictionnaire par résultat, seulement les champs utiles au tableau.
+    """
+
+    __slots__ = ('title', 'snippet', 'link', 'query', 'date', 'rejected_by', 'future', 'new', 'institution', 'alternates')
+
+    def __init__(self, title='', snippet='', link='', query=''):
+        self.title = title
+        self.snippet = snippet
+        self.link = link
+        self.query = query  # Requête Serper qui a trouvé le résultat
+        self.date = None
+        self.rejected_by = None  # Règle du filtre qui écarte le résultat (None s'il est gardé)
+        self.future = True
+        self.new = False
+        self.institution = None
+        self.alternates = []  # Liens des quasi-doublons regroupés avec ce résultat
+
+    @classmethod
+    def from_item(cls, item, query=''):
+        """Record d'un résultat organique Serper ({'title', 'snippet', 'link', ...})"""
+        return cls(item.get('title') or '', item.get('snippet') or '', item.get('link') or '', query)
+
+    @property
+    def excluded(self):
+        return self.rejected_by is not None
+
+
+def institution_label(institution):
+    """Nom affiché d'une institution : "INSA Lyon (école d'ingénieurs, Auvergne-Rhône-Alpes)", ou son domaine"""
+    if institution is None:
+        return ''
+    details = ', '.join(value for value in (institution.type, institution.region) if value)
+    label = institution.name or institution.domain
+    return f"{label} ({details})" if details else label
+
+
+# Valeur de chaque colonne pour un EventRecord
+_COLUMN_VALUES = {
+    'Date': lambda record: record.date,
+    'Événement': lambda record: record.title,
+    'Description': lambda record: record.snippet,
+    'Lien': lambda record: record.link,
+    'Autres liens': lambda record: ' '.join(record.alternates),
+    'Institution': lambda record: institution_label(record.institution),
+    'Nouveau': lambda record: '🆕' if record.new else '',
+    'Requête Serper': lambda record: record.query,
+    'Rejeté par': lambda record: record.rejected_by or ('' if record.future else 'événement passé'),
+}
+
+
+def result_columns(institutions=False, mark_new=False):
+    """Colonnes des résultats d'une recherche ('Institution' si des institutions sont connues, 'Nouveau' en mode incrémental)"""
+    return RESULT_COLUMNS + (('Institution',) if institutions else ()) + (('Nouveau',) if mark_new else ())
+
+
+class ResultTable:
+    """Résultats d'une recherche rangés par colonne (une liste de valeurs par colonne)
+
+    Les vues filtrée et brute (ResultView) ne gardent que les indices de leurs lignes :
+    les résultats ne sont stockés qu'une fois, quel que soit le nombre de vues.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns  # nom -> liste des valeurs
+        self.size = len(next(iter(columns.values()), ()))
+
+    @classmethod
+    def from_records(cls, records, columns=RESULT_COLUMNS):
+        return cls({name: [_COLUMN_VALUES[name](record) for record in records] for name in columns})
+
+    def view(self, indices=None, columns=None):
+        """Vue des lignes indices (toutes par défaut) limitée aux colonnes columns (toutes par défaut)"""
+        return ResultView(self, range(self.size) if indices is None else indices, tuple(columns or self.columns))
+
+
+class ResultView(Sequence):
+    """Lignes d'une ResultTable désignées par leurs indices, sans copie des valeurs
+
+    Se parcourt comme une liste de lignes {colonne: valeur}, construites à la demande.
+    """
+
+    def __init__(self, table, indices, columns):
+        self.table = table
+        self.indices = indices
+        self.columns = columns
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Vue de toutes les lignes d'une table enregistrée avec to_columns()"""
+        return ResultTable(columns).view()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return ResultView(self.table, self.indices[position], self.columns)
+        index = self.indices[position]
+        return {name: self.table.columns[name][index] for name in self.columns}
+
+    def __iter__(self):
+        columns = [(name, self.table.columns[name]) for name in self.columns]
+        for index in self.indices:
+            yield {name: values[index] for name, values in columns}
+
+    def column(self, name):
+        values = self.table.columns[name]
+        return [values[index] for index in self.indices]
+
+    def where(self, name):
+        """Vue des lignes dont la colonne name n'est pas vide"""
+        values = self.table.columns[name]
+        return ResultView(self.table, [index for index in self.indices if values[index]], self.columns)
+
+    def to_columns(self):
+        """{colonne: valeurs} des lignes de la vue (pour l'enregistrer en JSON)"""
+        return {name: self.column(name) for name in self.columns}
+
+    def to_frame(self):
+        """DataFrame de la vue, construit colonne par colonne"""
+        import pandas as pd
+
+        return pd.DataFrame(self.to_columns(), columns=list(self.columns))
@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+from datetime import date
+
+# Codes HTTP pour lesquels la requête est retentée : limite de débit et erreurs serveur
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Limiteur de débit : `rate` jetons par seconde, avec une réserve d'au plus `capacity` jetons"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Attend qu'un jeton soit disponible et le consomme"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class RequestScheduler:
+    """Point de passage de tous les appels à Serper
+    
+    Limite le débit (TokenBucket), retente les réponses 429/5xx avec un délai exponentiel
+    aléatoire et tient le compte des crédits consommés dans la journée (compteur persistant).
+    """
+
+    def __init__(self, credits, rate, burst, max_retries=3, backoff=0.5, max_backoff=8):
+        self.credits = credits
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retries = 0
+
+    def used_today(self):
+        """Crédits consommés aujourd'hui"""
+        return self.credits.get(date.today().isoformat()) or 0
+
+    def remaining(self, daily_credits):
+        """Crédits encore disponibles aujourd'hui sur un quota de daily_credits"""
+        return max(0, daily_credits - self.used_today())
+
+    def retry_delay(self, response, attempt):
+        """Délai avant la tentative suivante : Retry-After si le serveur l'indique, sinon exponentiel avec jitter"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(self.max_backoff, int(retry_after))
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def send(self, request, credits=1):
+        """Envoie une requête (fonction sans argument qui retourne la réponse HTTP)
+        
+        Les crédits ne sont décomptés que pour les réponses 200.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            response = request()
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                self.retries += 1
+                time.sleep(self.retry_delay(response, attempt))
+                continue
+            if response.status_code == 200:
+                self.credits.add(date.today().isoformat(), credits)
+            return response
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import time
+
+from cache import CACHE_DIR
+from dates import DATE_EXTRACTION_VERSION, date_keys, start_of_day
+from urls import canonical_url
+
+
+class ResultStore:
+    """Base locale (SQLite) de tous les résultats déjà trouvés, indexée par URL canonique
+    
+    Chaque résultat garde sa date extraite (avec la version des règles d'extraction et si les pages
+    ont été consultées), sa région et ses dates de première et dernière apparition ; les index sur la date et la région rendent les requêtes "événements à partir
+    de telle date" indexées.
+    """
+
+    def __init__(self, path=None):
+        path = path or os.path.join(CACHE_DIR, 'results.sqlite3')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'url TEXT PRIMARY KEY, link TEXT NOT NULL, title TEXT, snippet TEXT, '
+            'date TEXT, date_key INTEGER, is_excluded INTEGER NOT NULL DEFAULT 0, '
+            'region TEXT, query TEXT, first_seen REAL NOT NULL, last_seen REAL NOT NULL, '
+            'extraction_version INTEGER, pages_checked INTEGER NOT NULL DEFAULT 0);'
+            'CREATE INDEX IF NOT EXISTS results_date ON results (date_key);'
+            'CREATE INDEX IF NOT EXISTS results_region_date ON results (region, date_key);'
+        )
+        # Bases créées avant l'enregistrement de la version d'extraction : leurs dates seront recalculées
+        existing = {row['name'] for row in self._conn.execute('PRAGMA table_info(results)')}
+        for column, definition in (('extraction_version', 'INTEGER'), ('pages_checked', 'INTEGER NOT NULL DEFAULT 0')):
+            if column not in existing:
+                self._conn.execute(f'ALTER TABLE results ADD COLUMN {column} {definition}')
+        self._conn.commit()
+
+    def known(self, links, pages_checked=False):
+        """Résultats déjà enregistrés parmi ces liens : {lien: date enregistrée}
+        
+        La date vaut None si elle a été extraite avec d'autres règles (DATE_EXTRACTION_VERSION), ou sans
+        consulter les pages alors que pages_checked le demande : elle est à extraire à nouveau.
+        """
+        return self._lookup(
+            links, 'CASE WHEN extraction_version = ? AND pages_checked >= ? THEN date END',
+            (DATE_EXTRACTION_VERSION, int(pages_checked))
+        )
+
+    def first_seen(self, links):
+        """Première apparition des résultats enregistrés parmi ces liens : {lien: horodatage}"""
+        return self._lookup(links, 'first_seen')
+
+    def _lookup(self, links, expression, params=()):
+        """{lien: valeur de l'expression SQL} des résultats enregistrés parmi ces liens"""
+        by_url = {canonical_url(link): link for link in links if link}
+        found = {}
+        with self._lock:
+            urls = list(by_url)
+            # Par paquets, pour rester sous la limite de paramètres de SQLite
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = self._conn.execute(
+                    f'SELECT url, {expression} AS value FROM results WHERE url IN ({",".join("?" * len(chunk))})',
+                    (*params, *chunk)
+                ).fetchall()
+                for row in rows:
+                    found[by_url[row['url']]] = row['value']
+        return found
+
+    def save(self, records, region=None, query=None, pages_checked=False):
+        """Enregistre des résultats enrichis (EventRecord, nouveaux ou déjà connus)
+        
+        pages_checked : les pages des résultats sans date dans leur extrait ont été consultées.
+        """
+        if not records:
+            return
+        now = time.time()
+        keys, valid = date_keys([record.date for record in records])
+        rows = [
+            (
+                canonical_url(record.link), record.link, record.title, record.snippet,
+                record.date, int(key) if is_valid else None, int(record.excluded),
+                region, query, now, now, DATE_EXTRACTION_VERSION, int(pages_checked)
+            )
+            for record, key, is_valid in zip(records, keys, valid)
+            if record.link
+        ]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO results (url, link, title, snippet, date, date_key, is_excluded, region, query, '
+                'first_seen, last_seen, extraction_version, pages_checked) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (url) DO UPDATE SET '
+                'link = excluded.link, title = excluded.title, snippet = excluded.snippet, '
+                'date = excluded.date, date_key = excluded.date_key, is_excluded = excluded.is_excluded, '
+                'region = excluded.region, query = excluded.query, last_seen = excluded.last_seen, '
+                'extraction_version = excluded.extraction_version, pages_checked = excluded.pages_checked',
+                rows
+            )
+            self._conn.commit()
+
+    def events_after(self, min_date=None, region=None, limit=1000):
+        """Événements enregistrés datés à partir de min_date (aujourd'hui par défaut), du plus proche au plus lointain"""
+        threshold = start_of_day(min_date)
+        params = [threshold.year * 10000 + threshold.month * 100 + threshold.day]
+        sql = 'SELECT * FROM results WHERE date_key >= ? AND is_excluded = 0'
+        if region:
+            sql += ' AND region = ?'
+            params.append(region)
+        sql += ' ORDER BY date_key LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
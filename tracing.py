@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+from cache import CACHE_DIR
+
+# Traces JSON des recherches (une par search_id)
+TRACE_DIR = os.path.join(CACHE_DIR, 'traces')
+
+
+class Trace:
+    """Chronologie d'une recherche : durée de chaque étape et compteurs (requêtes, octets, cache...)
+
+    Utilisable depuis plusieurs threads (appels Serper et pages web en parallèle).
+    """
+
+    enabled = True
+
+    def __init__(self, search_id=None):
+        self.search_id = search_id
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **details):
+        """Mesure la durée du bloc ; details (requête, URL...) est gardé avec l'étape"""
+        started = time.perf_counter()
+        try:
+            yield details
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self.spans.append({
+                    'name': name,
+                    'start_ms': round((started - self.started) * 1000, 2),
+                    'duration_ms': round((ended - started) * 1000, 2),
+                    'thread': threading.current_thread().name,
+                    **details
+                })
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def timeline(self):
+        """Étapes dans l'ordre où elles ont commencé (lignes de tableau pour le mode debug)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['start_ms'])
+        return [{
+            'Étape': span['name'],
+            'Début (ms)': span['start_ms'],
+            'Durée (ms)': span['duration_ms'],
+            'Détail': ' · '.join(f"{key}={value}" for key, value in span.items()
+                                 if key not in ('name', 'start_ms', 'duration_ms', 'thread')),
+        } for span in spans]
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'search_id': self.search_id,
+                'created': self.created,
+                'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+                'spans': sorted(self.spans, key=lambda span: span['start_ms']),
+                'counters': dict(self.counters),
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def write(self, directory=None):
+        """Écrit la trace dans <directory>/<search_id>.json et retourne le chemin"""
+        directory = directory or TRACE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{self.search_id or int(self.created)}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        return path
+
+
+class NullTrace:
+    """Trace désactivée : mêmes méthodes que Trace, sans rien mesurer"""
+
+    enabled = False
+
+    def span(self, name, **details):
+        # Un dictionnaire par appel : les appelants y écrivent depuis plusieurs threads
+        return nullcontext({})
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_TRACE = NullTrace()
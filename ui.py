@@ -0,0 +1,265 @@
+"""Éléments d'interface de l'application, définis une fois par processus plutôt qu'à chaque exécution du script"""
+import time
+
+import streamlit as st
+
+from engine import SearchLog
+
+
+class StreamlitLog(SearchLog):
+    """Affiche les messages de la recherche dans la page"""
+    
+    def __init__(self):
+        self.progress_bars = {}
+        self.partial_area = None
+    
+    def info(self, message):
+        st.info(message)
+    
+    def warning(self, message):
+        st.warning(message)
+    
+    def error(self, message):
+        st.error(message)
+    
+    def table(self, title, rows):
+        with st.expander(title):
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+    
+    def progress(self, done, total, message):
+        # Une barre par étape (requêtes Serper, pages web)
+        text = f"{message} : {done}/{total}"
+        if message not in self.progress_bars:
+            self.progress_bars[message] = st.progress(done / total, text=text)
+        else:
+            self.progress_bars[message].progress(done / total, text=text)
+    
+    def partial(self, rows):
+        # Tableau provisoire réécrit à la même place à chaque nouvelle réponse
+        if self.partial_area is None:
+            self.partial_area = st.empty()
+        with self.partial_area.container():
+            st.caption(f"⏳ {len(rows)} événement(s) trouvé(s) pour l'instant (résultats provisoires)")
+            st.dataframe(
+                rows.to_frame(),
+                column_config={
+                    "Lien": st.column_config.LinkColumn("Lien", display_text="Voir")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+    
+    def clear_partial(self):
+        """Retire les résultats provisoires une fois le résultat final affiché"""
+        if self.partial_area is not None:
+            self.partial_area.empty()
+
+
+def freshness(created):
+    """Âge de résultats calculés à l'horodatage created ("il y a 25 min")"""
+    minutes = int((time.time() - created) // 60)
+    if minutes < 1:
+        return "à l'instant"
+    if minutes < 60:
+        return f"il y a {minutes} min"
+    return f"il y a {minutes // 60} h {minutes % 60:02d}"
+
+
+def show_trace(trace, path=None):
+    """Chronologie de la recherche (mode debug) : durée de chaque étape, compteurs et trace JSON"""
+    data = trace.to_dict()
+    with st.expander(f"⏱️ Chronologie de la recherche : {data['total_ms']:.0f} ms, {len(data['spans'])} étape(s)"):
+        st.dataframe(
+            trace.timeline(),
+            column_config={
+                "Durée (ms)": st.column_config.ProgressColumn(
+                    "Durée (ms)", format="%.1f", min_value=0, max_value=max(data['total_ms'], 1)
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption(" · ".join(f"{name} : {value}" for name, value in sorted(data['counters'].items())))
+        if path:
+            st.caption(f"Trace enregistrée dans `{path}`")
+        st.download_button(
+            label="📥 Télécharger la trace (JSON)",
+            data=trace.to_json(),
+            file_name=f"trace-{trace.search_id}.json",
+            mime="application/json"
+        )
+
+
+# Contenu de l'onglet "À propos"
+ABOUT_MARKDOWN = """
+    ## 🎯 Qu'est-ce que cet outil ?
+    
+    Cet outil aide **Voix du Nucléaire** à trouver automatiquement des événements universitaires 
+    (forums des métiers, portes ouvertes, journées orientation) où présenter l'association et 
+    discuter de l'énergie nucléaire.
+    
+    Au lieu de chercher manuellement sur Google, l'outil fait le travail pour vous et affiche 
+    les résultats dans un tableau facile à exporter.
+    
+    ---
+    
+    ## 🔑 Pourquoi une clé API Serper ?
+    
+    **Serper** est un service qui permet de faire des recherches Google de manière automatisée.
+    
+    **Pourquoi c'est nécessaire :**
+    - Google ne permet pas de faire des recherches automatiques gratuitement
+    - Serper sert d'intermédiaire pour accéder aux résultats Google
+    - Chaque utilisateur doit avoir sa propre clé (gratuite)
+    
+    **Ce que ça coûte :**
+    - ✅ **100 recherches gratuites par jour** (largement suffisant !)
+    - Après 100 recherches : environ 5€ pour 1000 recherches supplémentaires
+    - Pour un usage normal : vous resterez dans le quota gratuit
+    
+    **Comment obtenir votre clé :**
+    1. Allez sur [serper.dev](https://serper.dev)
+    2. Créez un compte (avec Google ou email)
+    3. Copiez votre clé API (affichée sur le dashboard)
+    4. Collez-la dans la barre latérale de cet outil
+    
+    **Sécurité :**
+    - Votre clé n'est jamais sauvegardée sur nos serveurs
+    - Elle reste dans votre navigateur uniquement
+    - Ne partagez jamais votre clé avec d'autres personnes
+    
+    ---
+    
+    ## 📊 Pourquoi Google Sheets ?
+    
+    **Google Sheets** permet à chaque utilisateur d'avoir sa propre liste d'institutions à surveiller.
+    
+    **Avantages :**
+    - ✅ Facile à modifier (interface familière)
+    - ✅ Accessible de partout (ordinateur, téléphone)
+    - ✅ Partage possible avec des collègues
+    - ✅ Historique des modifications
+    
+    **Comment configurer :**
+    1. Créez une nouvelle Google Sheet
+    2. Mettez vos URLs d'institutions en colonne A (une par ligne)
+       ```
+       https://www.ec-lyon.fr/
+       https://www.insa-lyon.fr/
+       https://www.cpe.fr/
+       ```
+    3. Partager → "Tous les utilisateurs disposant du lien" → **Lecteur**
+    4. Copiez le lien de la Sheet
+    5. Collez-le dans la barre latérale de l'outil
+    6. Cliquez "💾 Sauvegarder"
+    
+    **Pour modifier votre liste :**
+    - Éditez directement votre Google Sheet
+    - Revenez dans l'outil et cliquez "🔄 Recharger"
+    
+    ---
+    
+    ## 🚀 Comment utiliser l'outil ?
+    
+    ### Workflow typique :
+    
+    1. **Configuration initiale** (une seule fois)
+       - Obtenez votre clé Serper
+       - Créez votre Google Sheet avec vos institutions
+       - Configurez les deux dans la barre latérale
+    
+    2. **Recherche d'événements**
+       - Allez dans l'onglet "🔍 Recherche"
+       - Choisissez le type d'événement (forum, portes ouvertes, etc.)
+       - Choisissez la région (ou "Toute la France")
+       - Décidez si vous cherchez uniquement dans vos institutions ou sur tout le web
+       - Cliquez "🔍 Rechercher"
+    
+    3. **Exploitation des résultats**
+       - Consultez le tableau
+       - Cliquez sur les liens pour vérifier les événements
+       - Téléchargez en CSV ou pour Excel
+       - Partagez avec votre équipe
+    
+    ---
+    
+    ## 🎛️ Options de recherche
+    
+    **Deux modes de recherche :**
+    - **🏫 Uniquement dans mes institutions** : Cherche SEULEMENT sur les sites de votre liste
+      (une requête regroupe une quinzaine de sites ; au-delà du nombre de requêtes choisi dans la barre latérale,
+      les recherches suivantes couvrent les institutions restantes)
+    - **🌐 Sur le web (+ priorité aux institutions)** : Cherche partout, mais privilégie vos institutions
+    
+    **Nombre de résultats :**
+    - **10** : Rapide, pour un coup d'œil
+    - **20** : Équilibré (recommandé)
+    - **50** : Recherche exhaustive (plus lent)
+    
+    **À partir du :**
+    - Sélectionnez une date pour ne voir que les événements à partir de cette date
+    - Par défaut : aujourd'hui (ne montre que les événements futurs)
+    - Utile pour planifier à l'avance (ex: "événements à partir de mars 2026")
+    
+    **Options avancées (barre latérale) :**
+    - **Chercher les dates sur les pages web** : Plus précis mais plus lent (les pages sont consultées en parallèle, 15 secondes maximum)
+    - **Mode debug** : Affiche des informations techniques sur la recherche
+    - **Durée du cache** : Une recherche identique relancée dans ce délai réutilise la réponse enregistrée, sans consommer de crédit Serper
+    - **Forcer l'actualisation** : Ignore le cache, interroge Serper à nouveau et revalide les pages web
+    - **Crédits Serper par jour** : Quand le quota est presque atteint, la requête principale passe en premier, puis les institutions ; le coût estimé s'affiche au-dessus du bouton 🔍 Rechercher
+    - **Vider le cache des pages** : Oublie les dates déjà trouvées sur les pages web
+    
+    ---
+    
+    ## 📋 Filtres automatiques
+    
+    L'outil filtre automatiquement :
+    - ❌ **Événements passés** (garde uniquement les événements futurs)
+    - ❌ **Tourisme, hôtellerie, restauration** (non pertinents pour VDN)
+    - ❌ **Événements sans rapport** avec les écoles/universités
+    
+    ---
+    
+    ## ❓ Questions fréquentes
+    
+    **Q : Pourquoi certaines dates sont "Date à confirmer" ?**  
+    R : La date n'apparaît pas dans le titre ou la description Google. Cliquez sur le lien pour la trouver sur le site.
+    
+    **Q : Puis-je partager ma clé Serper avec des collègues ?**  
+    R : Non, chaque personne doit avoir sa propre clé. C'est gratuit et rapide à créer.
+    
+    **Q : Puis-je partager ma Google Sheet avec des collègues ?**  
+    R : Oui ! Vous pouvez collaborer sur la même Sheet. Chacun devra juste mettre le même lien dans son outil.
+    
+    **Q : L'outil sauvegarde-t-il mes recherches ?**  
+    R : Les résultats trouvés sont enregistrés localement (date, région, première apparition) : les nouveaux sont signalés 🆕 lors des recherches suivantes, et « 📚 Événements déjà enregistrés » les liste sans consommer de crédit. Téléchargez-les en CSV pour les partager.
+    
+    **Q : Combien de recherches puis-je faire ?**  
+    R : 100 recherches gratuites par jour avec Serper. Une "recherche" peut générer 10-50 résultats.
+    
+    **Q : Les données sont-elles sécurisées ?**  
+    R : Oui. Votre clé API reste dans votre navigateur et n'est jamais envoyée à nos serveurs.
+    
+    ---
+    
+    ## 🆘 Besoin d'aide ?
+    
+    **Problème avec Serper :**
+    - Vérifiez que votre clé est bien copiée (pas d'espaces)
+    - Vérifiez que vous n'avez pas dépassé les 100 recherches/jour
+    
+    **Problème avec Google Sheets :**
+    - Vérifiez que la Sheet est bien en "Lecteur" pour "Tous les utilisateurs"
+    - Vérifiez que le lien est complet (commence par https://docs.google.com)
+    
+    **Aucun résultat trouvé :**
+    - Essayez avec des termes différents
+    - Essayez une autre région
+    - Essayez "Sur le web" au lieu de "Uniquement dans mes institutions"
+    
+    **Contactez l'équipe VDN si vous avez d'autres questions !**
+    
+    ---
+    
+    ## 📊 Statistiques de cette session
+"""
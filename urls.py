@@ -0,0 +1,46 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi (campagnes, clics publicitaires) : ils ne changent pas la page affichée
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'xtor', 'igshid', '_ga'}
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_')
+
+# Sous-domaines qui servent la même page qu'au domaine principal (site mobile, AMP)
+MIRROR_SUBDOMAINS = ('www.', 'm.', 'mobile.', 'amp.')
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """Forme normalisée d'une URL, pour reconnaître un même résultat d'une recherche à l'autre
+
+    http et https, le port par défaut, les sous-domaines www/mobile/AMP, la barre oblique finale,
+    l'ancre et les paramètres de suivi (utm_*, fbclid...) sont ignorés ; les autres paramètres
+    sont triés. Le résultat sert de clé : ce n'est pas forcément une URL à consulter.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+
+    host = (parts.hostname or '').lower()
+    for prefix in MIRROR_SUBDOMAINS:
+        # Garder au moins un domaine et son extension ("m.fr" reste tel quel)
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    try:
+        port = parts.port
+    except ValueError:
+        port = None  # Port illisible : ignoré
+    if port and port not in (80, 443):
+        host += f':{port}'
+
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    ))
+    return urlunsplit((scheme, host, path, query, ''))